@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import random
+
+PROJECT = "bench"
+DATABASE = "BENCH_DB"
+
+
+def _relation(database, schema, name):
+    return f"{database}.{schema}.{name}".lower()
+
+
+def _catalog_node(database, schema, name, columns):
+    return {
+        "metadata": {
+            "type": "BASE TABLE",
+            "schema": schema.upper(),
+            "name": name.upper(),
+            "database": database.upper(),
+            "comment": None,
+            "owner": None,
+        },
+        "columns": {
+            column.upper(): {"type": "TEXT", "index": index, "name": column.upper(), "comment": None}
+            for index, column in enumerate(columns, 1)
+        },
+    }
+
+
+def _manifest_columns(columns):
+    # the documented columns of a node, as dbt writes them; every node has this field
+    return {
+        column: {"name": column, "description": "", "meta": {}, "data_type": "TEXT", "tags": []}
+        for column in columns
+    }
+
+
+def _column_expression(column, aliases, index):
+    # mostly plain pass-through columns, with some expressions over several parents
+    if column == "id" or len(aliases) == 1 or index % 3 == 1:
+        return f"{aliases[index % len(aliases)]}.{column}"
+    if index % 3 == 2:
+        return f"coalesce({', '.join(f'{alias}.{column}' for alias in aliases[:3])})"
+    return f"{aliases[0]}.{column} || '-' || {aliases[-1]}.{column}"
+
+
+def _select_from_parents(parents, columns):
+    aliases = [f"p{i}" for i in range(len(parents))]
+    select_list = ",\n        ".join(
+        f"{_column_expression(column, aliases, index)} as {column}" for index, column in enumerate(columns)
+    )
+    from_clause = f"{parents[0]} as {aliases[0]}"
+    for parent, alias in zip(parents[1:], aliases[1:]):
+        from_clause += f"\n    left join {parent} as {alias} on {aliases[0]}.id = {alias}.id"
+    return f"select\n        {select_list}\n    from {from_clause}"
+
+
+def _build_sql(parent_relations, columns, cte_depth, join_width):
+    # parents beyond the join width are combined with union all, one branch per group
+    groups = [parent_relations[i:i + join_width] for i in range(0, len(parent_relations), join_width)]
+    branches = "\n    union all\n    ".join(_select_from_parents(group, columns) for group in groups)
+    ctes = [f"cte_0 as (\n    {branches}\n)"]
+    for depth in range(1, cte_depth):
+        select_list = ", ".join(columns)
+        ctes.append(f"cte_{depth} as (\n    select {select_list} from cte_{depth - 1}\n)")
+    return "with " + ",\n".join(ctes) + f"\n\nselect * from cte_{len(ctes) - 1}\n"
+
+
+def generate_project(models=100, depth=5, fan_in=3, columns=20, cte_depth=2, join_width=2, sources=None, seed=0):
+    """Generate a synthetic ``(manifest, catalog)`` pair shaped like a dbt project.
+
+    Sources feed ``depth`` layers of models; every model depends on ``fan_in`` models of
+    the previous layer (sources for the first layer), joins up to ``join_width`` of them
+    per ``union all`` branch, wraps the result in ``cte_depth`` nested CTEs, and has
+    ``columns`` columns, documented in the manifest and all present in the catalog.
+    """
+    rng = random.Random(seed)
+    sources = sources or max(fan_in, models // depth)
+    column_names = ["id"] + [f"col_{i:03d}" for i in range(1, columns)]
+    manifest = {"metadata": {"generator": "benchmarks/generate_project.py"}, "nodes": {}, "sources": {}}
+    catalog = {"metadata": {}, "nodes": {}, "sources": {}, "errors": None}
+
+    layer = []
+    for i in range(sources):
+        unique_id = f"source.{PROJECT}.raw.source_{i:05d}"
+        name = f"source_{i:05d}"
+        manifest["sources"][unique_id] = {
+            "database": DATABASE.lower(),
+            "schema": "raw",
+            "name": name,
+            "resource_type": "source",
+            "unique_id": unique_id,
+            "columns": _manifest_columns(column_names),
+        }
+        catalog["sources"][unique_id] = _catalog_node(DATABASE, "raw", name, column_names)
+        layer.append(unique_id)
+
+    relations = {
+        unique_id: _relation(node["database"], node["schema"], node["name"])
+        for unique_id, node in manifest["sources"].items()
+    }
+    model_index = 0
+    for layer_index in range(depth):
+        layer_size = models // depth + (1 if layer_index < models % depth else 0)
+        next_layer = []
+        for _ in range(layer_size):
+            name = f"model_{model_index:05d}"
+            unique_id = f"model.{PROJECT}.{name}"
+            schema = f"layer_{layer_index}"
+            parents = rng.sample(layer, min(fan_in, len(layer)))
+            manifest["nodes"][unique_id] = {
+                "database": DATABASE.lower(),
+                "schema": schema,
+                "name": name,
+                "resource_type": "model",
+                "package_name": PROJECT,
+                "path": f"{schema}/{name}.sql",
+                "original_file_path": f"models/{schema}/{name}.sql",
+                "unique_id": unique_id,
+                "tags": [schema],
+                "columns": _manifest_columns(column_names),
+                "depends_on": {"macros": [], "nodes": parents},
+                "compiled_code": _build_sql(
+                    [relations[parent] for parent in parents], column_names, cte_depth, join_width
+                ),
+            }
+            catalog["nodes"][unique_id] = _catalog_node(DATABASE, schema, name, column_names)
+            relations[unique_id] = _relation(DATABASE, schema, name)
+            next_layer.append(unique_id)
+            model_index += 1
+        layer = next_layer or layer
+
+    return manifest, catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dbt manifest.json and catalog.json")
+    parser.add_argument('--models', type=int, default=100, help='Number of models, default to 100')
+    parser.add_argument('--depth', type=int, default=5, help='Number of model layers in the DAG, default to 5')
+    parser.add_argument('--fan-in', type=int, default=3, help='Number of parents of every model, default to 3')
+    parser.add_argument('--columns', type=int, default=20, help='Number of columns of every model and source, default to 20')
+    parser.add_argument('--cte-depth', type=int, default=2, help='Number of nested CTEs in every model, default to 2')
+    parser.add_argument('--join-width', type=int, default=2, help='Number of parents joined per union all branch, default to 2')
+    parser.add_argument('--sources', type=int, default=None, help='Number of sources, default to models / depth')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed, default to 0')
+    parser.add_argument('--output-dir', default='./inputs', help='Directory to write manifest.json and catalog.json, default to ./inputs')
+    args = parser.parse_args()
+
+    manifest, catalog = generate_project(
+        models=args.models,
+        depth=args.depth,
+        fan_in=args.fan_in,
+        columns=args.columns,
+        cte_depth=args.cte_depth,
+        join_width=args.join_width,
+        sources=args.sources,
+        seed=args.seed,
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "manifest.json"), "w") as file:
+        json.dump(manifest, file)
+    with open(os.path.join(args.output_dir, "catalog.json"), "w") as file:
+        json.dump(catalog, file)
+    print(f"Generated {len(manifest['nodes'])} models and {len(manifest['sources'])} sources in {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import sqlglot
+
+from dbt_column_lineage_extractor import (
+    ColumnLineageGraph,
+    CompactLineage,
+    DbtColumnLineageExtractor,
+    LineageTemplates,
+    utils,
+)
+from generate_project import generate_project
+
+
+def _load(context):
+    return DbtColumnLineageExtractor(
+        manifest_path=context["manifest_path"], catalog_path=context["catalog_path"]
+    )
+
+
+def _build_lineage_map(context):
+    return context["extractor"].build_lineage_map()
+
+
+def _build_lineage_with_templates(context):
+    # generated models only differ by the parents they read from, so this is the best case
+    return context["extractor"].build_lineage_to_direct_parents(templates=LineageTemplates())
+
+
+def _get_columns_lineage(context):
+    return context["extractor"].get_columns_lineage_from_sqlglot_lineage_map(context["lineage_map"])
+
+
+def _invert_lineage(context):
+    return context["extractor"].get_lineage_to_direct_children_from_lineage_to_direct_parents(
+        context["lineage_to_direct_parents"]
+    )
+
+
+def _iter_extracted_lineage(lineage_to_direct_parents):
+    # every model's parents as extraction yields them, one model at a time, with fresh edge
+    # dicts and column strings
+    for model_node, columns in lineage_to_direct_parents.items():
+        yield model_node, {
+            column: [
+                {"column": parent["column"].lower(), "dbt_node": parent["dbt_node"]} for parent in parents
+            ]
+            for column, parents in columns.items()
+        }
+
+
+def _write_lineage_dicts(context):
+    # both maps held as dicts until the end of the run, as dbt_column_lineage_direct used to
+    parents, children = {}, {}
+    for model_node, columns in _iter_extracted_lineage(context["lineage_to_direct_parents"]):
+        context["extractor"].get_lineage_to_direct_children_from_lineage_to_direct_parents(
+            {model_node: columns}, children
+        )
+        parents[model_node] = columns
+    utils.write_dict_to_file(parents, os.path.join(context["tmp_dir"], "dict_parents.json"))
+    utils.write_dict_to_file(children, os.path.join(context["tmp_dir"], "dict_children.json"))
+
+
+def _write_lineage_compact(context):
+    lineage = CompactLineage()
+    for model_node, columns in _iter_extracted_lineage(context["lineage_to_direct_parents"]):
+        lineage.add_model(model_node, columns)
+    utils.write_items_to_file(
+        lineage.iter_parents(), os.path.join(context["tmp_dir"], "compact_parents.json")
+    )
+    utils.write_items_to_file(
+        lineage.iter_children(), os.path.join(context["tmp_dir"], "compact_children.json")
+    )
+
+
+def _find_all_ancestors(context):
+    return [
+        DbtColumnLineageExtractor.find_all_related(context["lineage_to_direct_parents"], model_node, column)
+        for model_node, column in context["queries"]
+    ]
+
+
+def _find_all_descendants(context):
+    return [
+        DbtColumnLineageExtractor.find_all_related(context["lineage_to_direct_children"], model_node, column)
+        for model_node, column in context["queries"]
+    ]
+
+
+def _find_all_ancestors_with_structure(context):
+    return [
+        DbtColumnLineageExtractor.find_all_related_with_structure(
+            context["lineage_to_direct_parents"], model_node, column
+        )
+        for model_node, column in context["queries"]
+    ]
+
+
+def _find_all_ancestors_graph_batch(context):
+    graph = ColumnLineageGraph(context["lineage_to_direct_parents"])
+    return list(graph.find_all_related_batch(context["queries"]))
+
+
+def _cli_recursive_single_query(context):
+    # a whole cli_recursive process: interpreter startup, imports, loading the lineage
+    # files and a single query
+    model_node, column = context["queries"][0]
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "dbt_column_lineage_extractor.cli_recursive",
+            "--model",
+            model_node,
+            "--column",
+            column,
+            "--lineage-parents-file",
+            context["lineage_parents_file"],
+            "--lineage-children-file",
+            context["lineage_children_file"],
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+# (name, function, context key the result is stored under for later benchmarks, whether
+# the benchmark runs in this process and its peak memory can be measured)
+BENCHMARKS = [
+    ("load", _load, "extractor", True),
+    ("build_lineage_map", _build_lineage_map, "lineage_map", True),
+    ("build_lineage_to_direct_parents_templates", _build_lineage_with_templates, None, True),
+    ("get_columns_lineage_from_sqlglot_lineage_map", _get_columns_lineage, "lineage_to_direct_parents", True),
+    ("get_lineage_to_direct_children_from_lineage_to_direct_parents", _invert_lineage, "lineage_to_direct_children", True),
+    ("write_lineage_dicts", _write_lineage_dicts, None, True),
+    ("write_lineage_compact", _write_lineage_compact, None, True),
+    ("find_all_related_ancestors", _find_all_ancestors, None, True),
+    ("find_all_related_descendants", _find_all_descendants, None, True),
+    ("find_all_related_with_structure_ancestors", _find_all_ancestors_with_structure, None, True),
+    ("column_lineage_graph_batch_ancestors", _find_all_ancestors_graph_batch, None, True),
+    ("cli_recursive_single_query", _cli_recursive_single_query, None, False),
+]
+
+
+def _get_queries(lineage_to_direct_parents, query_count):
+    # spread the queries evenly over every (model, column) pair, so both deep and shallow
+    # models are covered
+    pairs = [
+        (model_node, column)
+        for model_node, columns in lineage_to_direct_parents.items()
+        for column in columns
+    ]
+    step = max(1, len(pairs) // query_count)
+    return pairs[::step][:query_count]
+
+
+def run_benchmark(function, context, repeat, measure_memory):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(context)
+        timings.append(time.perf_counter() - start)
+    record = {
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "max_seconds": max(timings),
+        "repeat": repeat,
+    }
+    if measure_memory:
+        # a separate run, as tracing allocations slows the code down considerably
+        tracemalloc.start()
+        function(context)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record["peak_memory_mb"] = peak / 1024 / 1024
+    return record, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lineage extraction on a synthetic dbt project")
+    parser.add_argument('--manifest', default=None, help='Path to a manifest.json to benchmark instead of a generated project')
+    parser.add_argument('--catalog', default=None, help='Path to the catalog.json matching --manifest')
+    parser.add_argument('--models', type=int, default=100, help='Number of generated models, default to 100')
+    parser.add_argument('--depth', type=int, default=5, help='Number of generated model layers, default to 5')
+    parser.add_argument('--fan-in', type=int, default=3, help='Number of parents of every generated model, default to 3')
+    parser.add_argument('--columns', type=int, default=20, help='Number of columns of every generated model, default to 20')
+    parser.add_argument('--cte-depth', type=int, default=2, help='Number of nested CTEs in every generated model, default to 2')
+    parser.add_argument('--join-width', type=int, default=2, help='Number of parents joined per union all branch, default to 2')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the generator, default to 0')
+    parser.add_argument('--queries', type=int, default=100, help='Number of recursive lineage queries, default to 100')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of every benchmark, default to 3')
+    parser.add_argument('--benchmark', nargs='*', default=[], help='Names of the benchmarks to report, default to all; earlier benchmarks still run once when later ones need their results')
+    parser.add_argument('--no-memory', action='store_true', help='Flag to skip measuring peak memory with tracemalloc')
+    parser.add_argument('--output', default=None, help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    parameters = {
+        "models": args.models,
+        "depth": args.depth,
+        "fan_in": args.fan_in,
+        "columns": args.columns,
+        "cte_depth": args.cte_depth,
+        "join_width": args.join_width,
+        "seed": args.seed,
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        context = {"manifest_path": args.manifest, "catalog_path": args.catalog, "tmp_dir": tmp_dir}
+        if args.manifest is None:
+            manifest, catalog = generate_project(**parameters)
+            context["manifest_path"] = os.path.join(tmp_dir, "manifest.json")
+            context["catalog_path"] = os.path.join(tmp_dir, "catalog.json")
+            with open(context["manifest_path"], "w") as file:
+                json.dump(manifest, file)
+            with open(context["catalog_path"], "w") as file:
+                json.dump(catalog, file)
+            del manifest, catalog
+        else:
+            parameters = {"manifest": args.manifest, "catalog": args.catalog}
+
+        results = []
+        for name, function, result_key, in_process in BENCHMARKS:
+            if args.benchmark and name not in args.benchmark:
+                result = function(context) if result_key is not None else None
+            else:
+                record, result = run_benchmark(
+                    function, context, args.repeat, in_process and not args.no_memory
+                )
+                record["name"] = name
+                results.append(record)
+                memory = f", peak {record['peak_memory_mb']:.1f} MB" if "peak_memory_mb" in record else ""
+                print(f"{name}: median {record['median_seconds']:.4f}s, min {record['min_seconds']:.4f}s{memory}")
+            if result_key is not None:
+                context[result_key] = result
+            if result_key == "lineage_to_direct_parents":
+                context["queries"] = _get_queries(result, args.queries)
+                context["lineage_parents_file"] = os.path.join(tmp_dir, "lineage_to_direct_parents.json")
+                utils.write_dict_to_file(result, context["lineage_parents_file"])
+            if result_key == "lineage_to_direct_children":
+                context["lineage_children_file"] = os.path.join(tmp_dir, "lineage_to_direct_children.json")
+                utils.write_dict_to_file(result, context["lineage_children_file"])
+
+    lineage_to_direct_parents = context.get("lineage_to_direct_parents", {})
+    output = {
+        "created_at": time.time(),
+        "python_version": platform.python_version(),
+        "sqlglot_version": sqlglot.__version__,
+        "parameters": parameters,
+        "counts": {
+            "models": len(lineage_to_direct_parents),
+            "columns": sum(len(columns) for columns in lineage_to_direct_parents.values()),
+            "edges": sum(
+                len(parents) for columns in lineage_to_direct_parents.values() for parents in columns.values()
+            ),
+            "queries": len(context.get("queries", [])),
+        },
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=4)
+        print(f"Benchmark results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
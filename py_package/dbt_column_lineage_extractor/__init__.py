@@ -1,18 +1,38 @@
-from .extractor import DbtColumnLineageExtractor, DBTNodeCatalog
-from .utils import (
-    clear_screen,
-    read_json,
-    pretty_print_dict,
-    write_dict_to_file,
-    read_dict_from_file
-)
+import importlib
 
-__all__ = [
-    "DbtColumnLineageExtractor",
-    "DBTNodeCatalog",
-    "clear_screen",
-    "read_json",
-    "pretty_print_dict",
-    "write_dict_to_file",
-    "read_dict_from_file",
-]
+# public names and the modules defining them; modules are imported on first access, so the
+# query path (graph, store, server) never imports sqlglot
+_EXPORTS = {
+    "DbtColumnLineageExtractor": "extractor",
+    "DBTNodeCatalog": "extractor",
+    "ModelLineageEngine": "extractor",
+    "LineageCache": "cache",
+    "LineageTimeouts": "timeouts",
+    "LineageMetrics": "metrics",
+    "LineageTemplates": "templates",
+    "ColumnLineageGraph": "graph",
+    "CompactLineage": "graph",
+    "LineageStore": "store",
+    "write_lineage_store": "store",
+    "LazyLineageResolver": "lazy",
+    "LineageQueryService": "server",
+    "clear_screen": "utils",
+    "read_json": "utils",
+    "pretty_print_dict": "utils",
+    "write_dict_to_file": "utils",
+    "read_dict_from_file": "utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import sqlglot
+
+
+class LineageCache:
+    """Persistent on-disk cache of per-model lineage extraction results.
+
+    Each entry holds the table leaves of every column of one model, keyed by the model id,
+    dialect, sqlglot version, and hashes of the model's compiled SQL, the schema slice of its
+    parents and its own catalog columns. A hit therefore means sqlglot would produce the same
+    result, and the model can be skipped entirely.
+    """
+
+    def __init__(self, cache_dir, max_size_mb=1024, max_age_days=30):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024 if max_size_mb else None
+        self.max_age_seconds = max_age_days * 24 * 60 * 60 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _hash(value):
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    def make_key(self, model_node, dialect, model_sql, schema, columns):
+        key_parts = [
+            model_node,
+            str(dialect),
+            sqlglot.__version__,
+            self._hash(model_sql),
+            self._hash(schema),
+            self._hash(columns),
+        ]
+        return self._hash("\n".join(key_parts))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as file:
+                value = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # refresh the access time used for eviction
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(value, file)
+        os.replace(tmp_path, self._path(key))
+
+    def evict(self):
+        """Remove entries older than ``max_age_days``, then the least recently used ones
+        until the cache fits in ``max_size_mb``. Returns the number of removed entries."""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        removed = 0
+        total_size = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            expired = self.max_age_seconds is not None and now - mtime > self.max_age_seconds
+            oversized = self.max_size_bytes is not None and total_size > self.max_size_bytes
+            if not (expired or oversized):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            removed += 1
+        return removed
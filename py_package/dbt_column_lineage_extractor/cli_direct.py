@@ -1,17 +1,50 @@
 import argparse
 import dbt_column_lineage_extractor.utils as utils
-from dbt_column_lineage_extractor import DbtColumnLineageExtractor
+from dbt_column_lineage_extractor import CompactLineage, DbtColumnLineageExtractor, LineageCache, LineageMetrics, LineageTemplates, LineageTimeouts
+from dbt_column_lineage_extractor import shard
+from dbt_column_lineage_extractor.store import LineageStoreWriter
 
 def main():
     parser = argparse.ArgumentParser(description="DBT Column Lineage Extractor CLI")
     parser.add_argument('--manifest', default='./inputs/manifest.json', help='Path to the manifest.json file, default to ./inputs/manifest.json')
     parser.add_argument('--catalog', default='./inputs/catalog.json', help='Path to the catalog.json file, default to ./inputs/catalog.json')
     parser.add_argument('--dialect', default='snowflake', help='SQL dialect to use, default is snowflake, more dialects at https://github.com/tobymao/sqlglot/tree/v25.24.5/sqlglot/dialects')
-    parser.add_argument('--model', nargs='*', default=[], help='List of models to extract lineage for, default to all models')
+    parser.add_argument('--model', nargs='*', default=[], help='List of models to extract lineage for, default to all models. Accepts unique ids, model names and dbt-style selectors such as +model, model+, 2+model, tag:finance and path:models/staging')
+    parser.add_argument('--column', nargs='*', default=[], help='List of columns to extract lineage for, default to all columns. Accepts <model selector>:<column glob>, e.g. orders:amount or tag:pii:*email*, or a bare column glob matched in every selected model; only these columns are resolved')
+    parser.add_argument('--column-upstream', action='store_true', help='Flag to also extract the parent columns that the --column columns reference, transitively through the selected models')
     parser.add_argument('--output-dir', default='./outputs', help='Directory to write output json files, default to ./outputs')
+    parser.add_argument('--output-format', choices=['json', 'sqlite', 'both', 'ndjson'], default='json', help='Write the lineage as json files, as a single indexed lineage.db SQLite file, both, or as ndjson files with one line per model written while models are processed, default to json')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes used to extract lineage in parallel, default to 1')
+    parser.add_argument('--cache-dir', default=None, help='Directory of a persistent cache of per-model lineage results, reused across runs; disabled by default')
+    parser.add_argument('--cache-max-size-mb', type=int, default=1024, help='Evict least recently used cache entries above this total size, default to 1024')
+    parser.add_argument('--cache-max-age-days', type=int, default=30, help='Evict cache entries not used for this many days, default to 30')
+    parser.add_argument('--dedupe-templates', action='store_true', help='Flag to extract models whose compiled SQL only differs by the parent relations it reads from once, and share the lineage between them')
+    parser.add_argument('--state-dir', default=None, help='Directory with the previous run\'s manifest.json, catalog.json, lineage_to_direct_parents.json and lineage_to_direct_children.json; only models modified since then are re-extracted')
+    parser.add_argument('--column-timeout', type=float, default=None, help='Maximum number of seconds spent on the lineage of a single column, columns exceeding it are left out; disabled by default')
+    parser.add_argument('--model-timeout', type=float, default=None, help='Maximum number of seconds spent on a single model, including parsing, models exceeding it get no columns; disabled by default')
+    parser.add_argument('--quarantine-file', default=None, help='JSON file of models that timed out, kept across runs; quarantined models are processed last, default to <output-dir>/quarantine.json when a timeout is set')
+    parser.add_argument('--skip-quarantined', action='store_true', help='Flag to skip quarantined models instead of processing them last')
+    parser.add_argument('--profile', action='store_true', help='Flag to record per-model timings and counts, and print the slowest models at the end')
+    parser.add_argument('--profile-top', type=int, default=10, help='Number of slowest models printed with --profile, default to 10')
+    parser.add_argument('--profile-model', nargs='*', default=[], help='Models to run under cProfile, the stats are written to <output-dir>/<model>.prof')
+    parser.add_argument('--metrics-out', default=None, help='Write per-model timings and counts to this file, as CSV if it ends with .csv and as JSON otherwise')
+    parser.add_argument('--shard', default=None, help='Only extract shard i of N, e.g. 2/4, and write its partial lineage_to_direct_parents.shard_2_of_4.json; combine the shards with dbt_column_lineage_merge')
+    parser.add_argument('--shard-costs', default=None, help='Metrics file written by --metrics-out in a previous run, used to balance the shards by historical extraction time instead of SQL size')
     parser.add_argument('--show-ui', action='store_true', help='Flag to show lineage outputs in the console')
 
     args = parser.parse_args()
+    shard_index = shard_count = None
+    if args.shard:
+        try:
+            shard_index, shard_count = shard.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.state_dir or args.output_format != 'json':
+            parser.error("--shard only supports --output-format json, without --state-dir")
+    if args.column and (args.state_dir or args.shard):
+        parser.error("--column is not supported with --state-dir or --shard")
+    if args.column_upstream and not args.column:
+        parser.error("--column-upstream requires --column")
 
     # utils.clear_screen()
 
@@ -22,27 +55,142 @@ def main():
         dialect=args.dialect,
     )
 
-    lineage_map = extractor.build_lineage_map()
-    lineage_to_direct_parents = extractor.get_columns_lineage_from_sqlglot_lineage_map(lineage_map)
-    lineage_to_direct_children = (
-        extractor.get_lineage_to_direct_children_from_lineage_to_direct_parents(
-            lineage_to_direct_parents
+    if args.shard:
+        costs = shard.read_costs(args.shard_costs) if args.shard_costs else None
+        extractor.selected_models = shard.get_shard_models(
+            extractor.manifest, extractor.selected_models, shard_index, shard_count, costs
         )
-    )
+        print(f"Shard {shard_index}/{shard_count}: {len(extractor.selected_models)} models")
 
-    utils.write_dict_to_file(
-        lineage_to_direct_parents, f"{args.output_dir}/lineage_to_direct_parents.json"
-    )
+    cache = None
+    if args.cache_dir:
+        cache = LineageCache(
+            args.cache_dir,
+            max_size_mb=args.cache_max_size_mb,
+            max_age_days=args.cache_max_age_days,
+        )
 
-    utils.write_dict_to_file(
-        lineage_to_direct_children, f"{args.output_dir}/lineage_to_direct_children.json"
-    )
+    templates = LineageTemplates() if args.dedupe_templates else None
+
+    timeouts = None
+    if args.column_timeout or args.model_timeout or args.quarantine_file:
+        timeouts = LineageTimeouts(
+            column_timeout=args.column_timeout,
+            model_timeout=args.model_timeout,
+            quarantine_file=args.quarantine_file or f"{args.output_dir}/quarantine.json",
+            skip_quarantined=args.skip_quarantined,
+        )
+
+    metrics = None
+    if args.profile or args.metrics_out or args.profile_model:
+        metrics = LineageMetrics(profile_models=args.profile_model, profile_dir=args.output_dir)
+
+    if args.state_dir:
+        lineage_to_direct_parents = utils.read_dict_from_file(
+            f"{args.state_dir}/lineage_to_direct_parents.json"
+        )
+        lineage_to_direct_children = utils.read_dict_from_file(
+            f"{args.state_dir}/lineage_to_direct_children.json"
+        )
+        extractor.update_lineage_from_state(
+            previous_manifest_path=f"{args.state_dir}/manifest.json",
+            previous_catalog_path=f"{args.state_dir}/catalog.json",
+            lineage_to_direct_parents=lineage_to_direct_parents,
+            lineage_to_direct_children=lineage_to_direct_children,
+            workers=args.workers,
+            cache=cache,
+            timeouts=timeouts,
+            metrics=metrics,
+            templates=templates,
+        )
+        model_lineages = lineage_to_direct_parents.items()
+        iter_parents, iter_children = lineage_to_direct_parents.items, lineage_to_direct_children.items
+    else:
+        # the lineage is held in compact form; the parents and children dicts are only
+        # built one model at a time, when the outputs are written
+        lineage = CompactLineage()
+        iter_parents, iter_children = lineage.iter_parents, lineage.iter_children
+        if args.column:
+            selected_columns = extractor.select_columns(args.column)
+            print(
+                f"Selected {sum(len(x) for x in selected_columns.values())} columns in {len(selected_columns)} models"
+            )
+            model_lineages = extractor.iter_lineage_for_columns(
+                selected_columns,
+                upstream=args.column_upstream,
+                workers=args.workers,
+                cache=cache,
+                timeouts=timeouts,
+                metrics=metrics,
+                templates=templates,
+            )
+        else:
+            model_lineages = extractor.iter_lineage_to_direct_parents(
+                workers=args.workers, cache=cache, timeouts=timeouts, metrics=metrics, templates=templates
+            )
+
+    # each model's parent columns are written out as soon as they are extracted; they are
+    # only kept when needed for the json outputs, the ndjson children or --show-ui
+    keep_parents = args.output_format != "sqlite" or args.show_ui
+    store_writer = None
+    if args.output_format in ("sqlite", "both"):
+        store_writer = LineageStoreWriter(f"{args.output_dir}/lineage.db")
+    ndjson_file = None
+    if args.output_format == "ndjson":
+        ndjson_file = open(f"{args.output_dir}/lineage_to_direct_parents.ndjson", "w")
+
+    for model_node, columns in model_lineages:
+        if not args.state_dir and keep_parents:
+            lineage.add_model(model_node, columns)
+        if store_writer is not None:
+            store_writer.add_model(model_node, columns)
+        if ndjson_file is not None:
+            utils.write_ndjson_line({"dbt_node": model_node, "columns": columns}, ndjson_file)
+
+    if store_writer is not None:
+        store_writer.close()
+    if ndjson_file is not None:
+        ndjson_file.close()
+        with open(f"{args.output_dir}/lineage_to_direct_children.ndjson", "w") as file:
+            for model_node, columns in iter_children():
+                utils.write_ndjson_line({"dbt_node": model_node, "columns": columns}, file)
+
+    if cache is not None:
+        evicted = cache.evict()
+        print(f"Lineage cache: {cache.hits} hits, {cache.misses} misses, {evicted} entries evicted")
+
+    if templates is not None:
+        print(templates.summary())
+
+    if timeouts is not None:
+        timeouts.save()
+        print(timeouts.summary())
+
+    if metrics is not None:
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+        if args.profile:
+            print(metrics.report(args.profile_top))
+
+    if args.shard:
+        utils.write_items_to_file(
+            iter_parents(),
+            f"{args.output_dir}/{shard.get_shard_file_name(shard_index, shard_count)}",
+        )
+    elif args.output_format in ("json", "both"):
+        utils.write_items_to_file(
+            iter_parents(), f"{args.output_dir}/lineage_to_direct_parents.json"
+        )
+
+        utils.write_items_to_file(
+            iter_children(), f"{args.output_dir}/lineage_to_direct_children.json"
+        )
 
     if args.show_ui:
         print("===== Lineage to Direct Parents =====")
-        utils.pretty_print_dict(lineage_to_direct_parents)
+        utils.pretty_print_dict(dict(iter_parents()))
         print("===== Lineage to Direct Children =====")
-        utils.pretty_print_dict(lineage_to_direct_children)
+        utils.pretty_print_dict(dict(iter_children()))
 
     print("Lineage extraction complete. Output files written to output directory.")
 
@@ -0,0 +1,39 @@
+import argparse
+import dbt_column_lineage_extractor.utils as utils
+from dbt_column_lineage_extractor import loader, shard
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge DBT Column Lineage shards CLI")
+    parser.add_argument('--inputs', nargs='*', default=[], help='Partial lineage files written by dbt_column_lineage_direct --shard, default to every lineage_to_direct_parents.shard_*_of_*.json file in --input-dir')
+    parser.add_argument('--input-dir', default='./outputs', help='Directory with the shard files, default to ./outputs')
+    parser.add_argument('--manifest', default=None, help='Path to the manifest.json file used to order the models like an unsharded run, default to shard order')
+    parser.add_argument('--output-dir', default='./outputs', help='Directory to write output json files, default to ./outputs')
+
+    args = parser.parse_args()
+
+    file_paths = args.inputs or shard.find_shard_files(args.input_dir)
+    if not file_paths:
+        parser.error(f"No shard files found in {args.input_dir}")
+    try:
+        shard.check_shard_files(file_paths)
+    except ValueError as e:
+        parser.error(str(e))
+
+    model_order = None
+    if args.manifest:
+        model_order = list(loader.load_manifest(args.manifest)["nodes"])
+
+    lineage_to_direct_parents, lineage_to_direct_children = shard.merge_shards(
+        (utils.read_dict_from_file(file_path) for file_path in file_paths), model_order
+    )
+
+    utils.write_dict_to_file(
+        lineage_to_direct_parents, f"{args.output_dir}/lineage_to_direct_parents.json"
+    )
+    utils.write_dict_to_file(
+        lineage_to_direct_children, f"{args.output_dir}/lineage_to_direct_children.json"
+    )
+    print(f"Merged {len(file_paths)} shards with {len(lineage_to_direct_parents)} models. Output files written to output directory.")
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,94 @@
+import time
+
+# measured before the package is imported, so --timings includes the import time
+STARTED_AT = time.perf_counter()
+
 import argparse
+import csv
+import json
+import sys
 import dbt_column_lineage_extractor.utils as utils
-from dbt_column_lineage_extractor import DbtColumnLineageExtractor
+from dbt_column_lineage_extractor import graph
+from dbt_column_lineage_extractor.graph import ColumnLineageGraph
+from dbt_column_lineage_extractor.store import LineageStore
 
 def main():
     parser = argparse.ArgumentParser(description="Recursive DBT Column Lineage Extractor CLI")
-    parser.add_argument('--model', required=True, help='Model node to find lineage for, e.g. model.jaffle_shop.stg_orders')
-    parser.add_argument('--column', required=True, help='Column name to find lineage for, e.g. order_id')
+    parser.add_argument('--model', help='Model node to find lineage for, e.g. model.jaffle_shop.stg_orders')
+    parser.add_argument('--column', help='Column name to find lineage for, e.g. order_id')
+    parser.add_argument('--input', default=None, help='CSV file with "model" and "column" headers to answer many queries in one pass instead of --model/--column; squashed ancestors and descendants are written as NDJSON, one line per query')
+    parser.add_argument('--output', default=None, help='Path of the NDJSON file written with --input, default to stdout')
     parser.add_argument('--lineage-parents-file', default='./outputs/lineage_to_direct_parents.json',                        help='Path to the lineage_to_direct_parents.json file, default to ./outputs/lineage_to_direct_parents.json')
     parser.add_argument('--lineage-children-file', default='./outputs/lineage_to_direct_children.json',                        help='Path to the lineage_to_direct_children.json file, default to ./outputs/lineage_to_direct_children.json')
-
+    parser.add_argument('--lineage-store', default=None, help='Path to a lineage.db file written by dbt_column_lineage_direct --output-format sqlite, used instead of the json files; only the part of the graph a query reaches is read')
+    parser.add_argument('--max-depth', type=int, default=None, help='Only follow lineage up to this many hops, default to no limit')
+    parser.add_argument('--lazy', action='store_true', help='Resolve lineage on demand from the manifest and catalog instead of the lineage files, extracting only the models the query reaches')
+    parser.add_argument('--manifest', default='./inputs/manifest.json', help='Path to the manifest.json file used with --lazy, default to ./inputs/manifest.json')
+    parser.add_argument('--catalog', default='./inputs/catalog.json', help='Path to the catalog.json file used with --lazy, default to ./inputs/catalog.json')
+    parser.add_argument('--dialect', default='snowflake', help='SQL dialect used with --lazy, default is snowflake')
+    parser.add_argument('--timings', action='store_true', help='Flag to print the startup, load and query times to stderr')
 
     args = parser.parse_args()
+    if args.input is None and (args.model is None or args.column is None):
+        parser.error("--model and --column are required unless --input is given")
+    if args.input is not None and args.max_depth is not None:
+        parser.error("--max-depth is not supported with --input")
 
     # utils.clear_screen()
 
-    # Read lineage data from files
-    lineage_to_direct_parents = utils.read_dict_from_file(args.lineage_parents_file)
-    lineage_to_direct_children = utils.read_dict_from_file(args.lineage_children_file)
+    load_started_at = time.perf_counter()
+    resolver = None
+    if args.lazy or args.lineage_store:
+        if args.lazy:
+            # only the lazy mode parses SQL, so sqlglot is only imported here
+            from dbt_column_lineage_extractor.extractor import DbtColumnLineageExtractor
+            from dbt_column_lineage_extractor.lazy import LazyLineageResolver
+
+            extractor = DbtColumnLineageExtractor(
+                manifest_path=args.manifest,
+                catalog_path=args.catalog,
+                dialect=args.dialect,
+            )
+            resolver = LazyLineageResolver(extractor)
+        else:
+            resolver = LineageStore(args.lineage_store)
+        lineage_to_direct_parents = resolver.lineage_to_direct_parents
+        lineage_to_direct_children = resolver.lineage_to_direct_children
+        find_all_related = graph.find_all_related
+        find_all_related_with_structure = graph.find_all_related_with_structure
+        find_all_related_batch = iter_all_related
+    else:
+        # Read lineage data from files, and index them for the queries
+        lineage_to_direct_parents = ColumnLineageGraph(
+            utils.read_dict_from_file(args.lineage_parents_file)
+        )
+        lineage_to_direct_children = ColumnLineageGraph(
+            utils.read_dict_from_file(args.lineage_children_file)
+        )
+        find_all_related = ColumnLineageGraph.find_all_related
+        find_all_related_with_structure = ColumnLineageGraph.find_all_related_with_structure
+        find_all_related_batch = ColumnLineageGraph.find_all_related_batch
+    query_started_at = time.perf_counter()
+
+    if args.input is not None:
+        queries = read_queries(args.input)
+        write_batch_results(
+            args.output,
+            find_all_related_batch(lineage_to_direct_parents, queries),
+            find_all_related_batch(lineage_to_direct_children, queries),
+        )
+        if args.timings:
+            print_timings(load_started_at, query_started_at)
+        return
 
     print("========================================")
     # Find all ancestors for a specific model and column
     print(f"Finding all ancestors of {args.model}.{args.column}:")
-    ancestors_squashed = DbtColumnLineageExtractor.find_all_related(lineage_to_direct_parents, args.model, args.column)
-    ancestors_structured = DbtColumnLineageExtractor.find_all_related_with_structure(
-        lineage_to_direct_parents, args.model, args.column
+    ancestors_squashed = find_all_related(
+        lineage_to_direct_parents, args.model, args.column, max_depth=args.max_depth
+    )
+    ancestors_structured = find_all_related_with_structure(
+        lineage_to_direct_parents, args.model, args.column, max_depth=args.max_depth
     )
 
     print("---squashed ancestors---")
@@ -34,11 +99,11 @@ def main():
     print("========================================")
     # Find all descendants for a specific model and column
     print(f"Finding all descendants of {args.model}.{args.column}:")
-    descendants_squashed = DbtColumnLineageExtractor.find_all_related(
-        lineage_to_direct_children, args.model, args.column
+    descendants_squashed = find_all_related(
+        lineage_to_direct_children, args.model, args.column, max_depth=args.max_depth
     )
-    descendants_structured = DbtColumnLineageExtractor.find_all_related_with_structure(
-        lineage_to_direct_children, args.model, args.column
+    descendants_structured = find_all_related_with_structure(
+        lineage_to_direct_children, args.model, args.column, max_depth=args.max_depth
     )
 
     print("---squashed descendants---")
@@ -46,6 +111,11 @@ def main():
     print("---structured descendants---")
     utils.pretty_print_dict(descendants_structured)
 
+    if args.lazy:
+        print(f"Lazily extracted lineage for {len(resolver.extracted_models)} models")
+    if args.timings:
+        print_timings(load_started_at, query_started_at)
+
     print("========================================")
     print(
         "You can use the structured ancestors and descendants to programmatically use the lineage, "
@@ -56,5 +126,44 @@ def main():
         "https://jsoncrack.com/editor to visualize the lineage"
     )
 
+
+def read_queries(input_path):
+    with open(input_path, "r", newline="") as file:
+        return [(row["model"], row["column"]) for row in csv.DictReader(file)]
+
+
+def iter_all_related(lineage_map, queries):
+    for model, column in queries:
+        yield model, column, graph.find_all_related(lineage_map, model, column)
+
+
+def print_timings(load_started_at, query_started_at):
+    finished_at = time.perf_counter()
+    print(
+        f"Startup {load_started_at - STARTED_AT:.3f}s, "
+        f"loading lineage {query_started_at - load_started_at:.3f}s, "
+        f"queries {finished_at - query_started_at:.3f}s",
+        file=sys.stderr,
+    )
+
+
+def write_batch_results(output_path, ancestors, descendants):
+    output = open(output_path, "w") if output_path else sys.stdout
+    try:
+        for (model, column, ancestors_squashed), (_, _, descendants_squashed) in zip(
+            ancestors, descendants
+        ):
+            result = {
+                "model": model,
+                "column": column,
+                "ancestors": ancestors_squashed,
+                "descendants": descendants_squashed,
+            }
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,23 @@
+import argparse
+from dbt_column_lineage_extractor.server import LineageQueryService, serve
+
+def main():
+    parser = argparse.ArgumentParser(description="DBT Column Lineage query server")
+    parser.add_argument('--lineage-parents-file', default='./outputs/lineage_to_direct_parents.json', help='Path to the lineage_to_direct_parents.json file, default to ./outputs/lineage_to_direct_parents.json; descendants are answered from the same file')
+    parser.add_argument('--lineage-store', default=None, help='Path to a lineage.db file written by dbt_column_lineage_direct --output-format sqlite, queried instead of loading the json file')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to listen on, default to 127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on, default to 8080')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Number of query results kept in the LRU cache, default to 1024')
+    parser.add_argument('--reload-interval', type=float, default=5, help='Seconds between checks of the lineage file for changes, 0 to disable reloading, default to 5')
+
+    args = parser.parse_args()
+
+    service = LineageQueryService(
+        lineage_parents_file=None if args.lineage_store else args.lineage_parents_file,
+        lineage_store=args.lineage_store,
+        cache_size=args.cache_size,
+    )
+    serve(service, host=args.host, port=args.port, reload_interval=args.reload_interval)
+
+if __name__ == '__main__':
+    main()
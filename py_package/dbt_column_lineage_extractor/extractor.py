@@ -1,14 +1,22 @@
+import cProfile
+import functools
+import time
 import warnings
+from concurrent.futures import Future, ProcessPoolExecutor
 from sqlglot.lineage import lineage, maybe_parse, SqlglotError, exp
-from . import utils
+from sqlglot.optimizer import build_scope, qualify
+from . import graph, loader, selector, state
+from .schema_index import SchemaIndex
+from .timeouts import LineageTimeoutError, time_limit
 
 
 class DbtColumnLineageExtractor:
     def __init__(self, manifest_path, catalog_path, selected_models=[], dialect="snowflake"):
-        self.manifest = utils.read_json(manifest_path)
-        self.catalog = utils.read_json(catalog_path)
-        self.schema_dict = self._generate_schema_dict_from_catalog()
+        self.manifest = loader.load_manifest(manifest_path)
+        self.catalog = loader.load_catalog(catalog_path)
+        self.schema_index = SchemaIndex(self.catalog)
         self.node_mapping = self._get_dict_mapping_full_table_name_to_dbt_node()
+        self._dbt_nodes_by_table_name = {}
         self.dialect = dialect
 
         if not selected_models:
@@ -19,7 +27,13 @@ class DbtColumnLineageExtractor:
                 if self.manifest["nodes"][x]["resource_type"] == "model"
             ]
         else:
-            self.selected_models = selected_models
+            self.selected_models = selector.select_models(self.manifest, selected_models)
+
+    @functools.cached_property
+    def schema_dict(self):
+        # the full schema, built once on first access; extraction uses the per-model
+        # slices of schema_index instead
+        return self._generate_schema_dict_from_catalog()
 
     def _generate_schema_dict_from_catalog(self, catalog=None):
         if not catalog:
@@ -80,34 +94,24 @@ class DbtColumnLineageExtractor:
         return parent_catalog
 
     def _extract_lineage_for_model(self, model_sql, schema, model_node, selected_columns=[]):
-        lineage_map = {}
+        engine = ModelLineageEngine(model_sql, schema=schema, dialect=self.dialect)
         if not selected_columns:
-            parsed_sql = maybe_parse(model_sql, dialect=self.dialect)
-            selected_columns = [
-                column.name if isinstance(column, exp.Column) else column.alias
-                for select in parsed_sql.find_all(exp.Select)
-                for column in select.expressions
-                if isinstance(column, (exp.Column, exp.Alias))
-            ]
-
-        for column_name in selected_columns:
-            try:
-                lineage_node = lineage(column_name, model_sql, schema=schema, dialect=self.dialect)
-                lineage_map[column_name] = lineage_node
-            except SqlglotError as e:
-                print(f"Error processing model {model_node}, column {column_name}: {e}")
-
-        return lineage_map
-
-    def build_lineage_map(self):
-        lineage_map = {}
-        total_models = len(self.selected_models)
+            selected_columns = engine.get_output_columns()
+        return engine.lineage_for_columns(selected_columns, model_node=model_node)
+
+    def _iter_model_tasks(self, models=None, timeouts=None, selected_columns=None):
+        selected_models = self.selected_models if models is None else models
+        if timeouts is not None:
+            selected_models = timeouts.order_models(selected_models)
+        total_models = len(selected_models)
         processed_count = 0
 
-        for model_node, model_info in self.manifest["nodes"].items():
-
-            if self.selected_models and model_node not in self.selected_models:
+        # walk the selection itself rather than every manifest node, so a small subgraph
+        # of a large project is cheap to process
+        for model_node in selected_models:
+            if model_node not in self.manifest["nodes"]:
                 continue
+            model_info = self.manifest["nodes"][model_node]
 
             processed_count += 1
             print(f"{processed_count}/{total_models} Processing model {model_node}")
@@ -120,15 +124,33 @@ class DbtColumnLineageExtractor:
                     f"Skipping column lineage detection for {model_node} as it's not a model but a {model_info['resource_type']}"
                 )
                 continue
+            if timeouts is not None and timeouts.skip_quarantined and timeouts.is_quarantined(model_node):
+                print(f"Skipping column lineage detection for quarantined model {model_node}")
+                continue
 
-            parent_catalog = self._get_parent_nodes_catalog(model_info)
+            parents = tuple(model_info["depends_on"]["nodes"])
             columns = self._get_list_of_columns_for_a_dbt_node(model_node)
-            schema = self._generate_schema_dict_from_catalog(parent_catalog)
+            if selected_columns is not None and columns:
+                # only the selected columns are resolved; without catalog columns every
+                # output column is, and the results are filtered when they are reduced
+                picked = selected_columns.get(model_node, ())
+                columns = [column for column in columns if column.lower() in picked]
+                if not columns:
+                    continue
             model_sql = model_info["compiled_code"]
 
+            yield model_node, model_sql, parents, columns
+
+    def build_lineage_map(self, selected_columns=None):
+        # selected_columns maps models to lowercased columns, see select_columns
+        lineage_map = {}
+
+        for model_node, model_sql, parents, columns in self._iter_model_tasks(
+            selected_columns=selected_columns
+        ):
             model_lineage = self._extract_lineage_for_model(
                 model_sql=model_sql,
-                schema=schema,
+                schema=self.schema_index.get_mapping_schema(parents, self.dialect),
                 model_node=model_node,
                 selected_columns=columns,
             )
@@ -136,132 +158,678 @@ class DbtColumnLineageExtractor:
 
         return lineage_map
 
-    def get_dbt_node_from_sqlglot_table_node(self, node):
-        if node.source.key != "table":
-            raise ValueError(f"Node source is not a table, but {node.source.key}")
-        column_name = node.name.split(".")[-1].lower()
-        table_name = f"{node.source.catalog}.{node.source.db}.{node.source.name}"
-        table_name = table_name.lower()
-
-        if table_name in self.node_mapping:
-            dbt_node = self.node_mapping[table_name].lower()
-        else:
-            warnings.warn(f"Table {table_name} not found in node mapping")
-            dbt_node = f"_NOT_FOUND___{table_name.lower()}"
-            # raise ValueError(f"Table {table_name} not found in node mapping")
-
-        return {"column": column_name, "dbt_node": dbt_node}
-
-    def get_columns_lineage_from_sqlglot_lineage_map(self, lineage_map, picked_columns=[]):
-        columns_lineage = {key.lower(): {} for key in self.selected_models}
-
-        for model_node, columns in lineage_map.items():
-            model_node = model_node.lower()
-            for column, node in columns.items():
-                column = column.lower()
-                if picked_columns and column not in picked_columns:
-                    continue
-
-                columns_lineage[model_node][column] = []
-                for n in node.walk():
-                    if n.source.key == "table":
-                        parent_columns = self.get_dbt_node_from_sqlglot_table_node(n)
-                        if (
-                            parent_columns["dbt_node"] != model_node
-                            and parent_columns not in columns_lineage[model_node][column]
-                        ):
-                            columns_lineage[model_node][column].append(parent_columns)
-                if not columns_lineage[model_node][column]:
-                    warnings.warn(f"No lineage found for {model_node} - {column}")
-        return columns_lineage
-
-    def get_lineage_to_direct_children_from_lineage_to_direct_parents(
-        self, lineage_to_direct_parents
+    def _get_parent_relations(self, parents):
+        # the relation name each parent is rendered as in compiled SQL, with its column types
+        relations = []
+        for parent in dict.fromkeys(parents):
+            node = self.manifest["nodes"].get(parent) or self.manifest["sources"].get(parent)
+            if node is None:
+                continue
+            relation_name = node.get("relation_name") or DBTNodeManifest(node).full_table_name
+            relations.append((relation_name, self.schema_index.get_column_types(parent)))
+        return relations
+
+    def _iter_model_table_leaves(
+        self,
+        workers=1,
+        cache=None,
+        models=None,
+        timeouts=None,
+        metrics=None,
+        selected_columns=None,
+        templates=None,
     ):
-        children_lineage = {}
-
-        for child_model, columns in lineage_to_direct_parents.items():
-            child_model = child_model.lower()
-            for child_column, parents in columns.items():
-                child_column = child_column.lower()
-                for parent in parents:
-                    parent_model = parent["dbt_node"].lower()
-                    parent_column = parent["column"].lower()
+        if workers > 1:
+            yield from self._iter_model_table_leaves_parallel(
+                workers, cache, models, timeouts, metrics, selected_columns, templates
+            )
+            return
+
+        for model_node, model_sql, parents, columns in self._iter_model_tasks(
+            models, timeouts, selected_columns
+        ):
+            if metrics is not None:
+                metrics.add_task(model_node, model_sql, parents)
+            cache_key = None
+            if cache is not None:
+                schema = self.schema_index.get_schema_dict(parents)
+                cache_key = cache.make_key(model_node, self.dialect, model_sql, schema, columns)
+                column_leaves = cache.get(cache_key)
+                if column_leaves is not None:
+                    if metrics is not None:
+                        metrics.add_extraction(model_node, None)
+                    yield model_node, column_leaves
+                    continue
+            template = None
+            if templates is not None:
+                template = templates.make_key(
+                    model_sql, self._get_parent_relations(parents), columns, self.dialect
+                )
+                column_leaves = templates.get(*template)
+                if column_leaves is not None:
+                    self._handle_template_hit(model_node, column_leaves, cache, cache_key, metrics)
+                    yield model_node, column_leaves
+                    continue
 
-                    if parent_model not in children_lineage:
-                        children_lineage[parent_model] = {}
+            # in-process, the normalized MappingSchema can be shared between models
+            schema = self.schema_index.get_mapping_schema(parents, self.dialect)
+            result = _extract_table_leaves_for_model(
+                (model_node, model_sql, schema, columns, self.dialect)
+                + self._get_task_options(model_node, timeouts, metrics)
+            )
+            yield model_node, self._handle_model_result(
+                result, cache, cache_key, timeouts, metrics, templates, template
+            )
 
-                    if parent_column not in children_lineage[parent_model]:
-                        children_lineage[parent_model][parent_column] = []
+    @staticmethod
+    def _get_task_options(model_node, timeouts, metrics):
+        column_timeout = model_timeout = profile_path = None
+        if timeouts is not None:
+            column_timeout, model_timeout = timeouts.column_timeout, timeouts.model_timeout
+        if metrics is not None:
+            profile_path = metrics.get_profile_path(model_node)
+        return column_timeout, model_timeout, profile_path
 
-                    children_lineage[parent_model][parent_column].append(
-                        {"column": child_column, "dbt_node": child_model}
-                    )
-        return children_lineage
+    @staticmethod
+    def _handle_model_result(
+        result, cache, cache_key, timeouts, metrics, templates=None, template=None
+    ):
+        model_node, column_leaves, timeout_result, extraction_metrics = result
+        if timeouts is not None:
+            timeouts.record(model_node, timeout_result)
+        if metrics is not None:
+            metrics.add_extraction(model_node, extraction_metrics)
+        # incomplete results of a model that timed out are never cached nor shared
+        if cache is not None and timeout_result is None:
+            cache.put(cache_key, column_leaves)
+        if templates is not None and timeout_result is None:
+            templates.put(template[0], template[1], column_leaves)
+        return column_leaves or {}
 
     @staticmethod
-    def find_all_related(lineage_map, model_node, column, visited=None):
-        column = column.lower()
-        model_node = model_node.lower()
-        if visited is None:
-            visited = set()
-        related = {}
-        if model_node in lineage_map and column in lineage_map[model_node]:
-            for related_node in lineage_map[model_node][column]:
-                related_model = related_node["dbt_node"]
-                related_column = related_node["column"]
-                if (related_model, related_column) not in visited:
-                    visited.add((related_model, related_column))
-                    if related_model not in related:
-                        related[related_model] = []
-                    related[related_model].append(related_column)
-                    further_related = DbtColumnLineageExtractor.find_all_related(
-                        lineage_map, related_model, related_column, visited
+    def _handle_template_hit(model_node, column_leaves, cache, cache_key, metrics):
+        if metrics is not None:
+            metrics.add_template_hit(model_node)
+        if cache is not None:
+            cache.put(cache_key, column_leaves)
+
+    def _iter_model_table_leaves_parallel(
+        self,
+        workers,
+        cache=None,
+        models=None,
+        timeouts=None,
+        metrics=None,
+        selected_columns=None,
+        templates=None,
+    ):
+        # results are collected in submission order, so the output matches the serial path
+        pending = []
+        submitted_templates = set()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for model_node, model_sql, parents, columns in self._iter_model_tasks(
+                models, timeouts, selected_columns
+            ):
+                if metrics is not None:
+                    metrics.add_task(model_node, model_sql, parents)
+                schema = self.schema_index.get_schema_dict(parents)
+                cache_key = None
+                if cache is not None:
+                    cache_key = cache.make_key(model_node, self.dialect, model_sql, schema, columns)
+                    column_leaves = cache.get(cache_key)
+                    if column_leaves is not None:
+                        if metrics is not None:
+                            metrics.add_extraction(model_node, None)
+                        pending.append((model_node, None, None, column_leaves))
+                        continue
+
+                task = (model_node, model_sql, schema, columns, self.dialect) + self._get_task_options(
+                    model_node, timeouts, metrics
+                )
+                template = None
+                if templates is not None:
+                    template = templates.make_key(
+                        model_sql, self._get_parent_relations(parents), columns, self.dialect
                     )
-                    for further_model, further_columns in further_related.items():
-                        if further_model not in related:
-                            related[further_model] = []
-                        related[further_model].extend(further_columns)
-        return related
+                    if template[0] in submitted_templates:
+                        # a model with the same template is in flight, its result is
+                        # shared once collected
+                        pending.append((model_node, cache_key, template, task))
+                        continue
+                    column_leaves = templates.get(*template)
+                    if column_leaves is not None:
+                        self._handle_template_hit(model_node, column_leaves, cache, cache_key, metrics)
+                        pending.append((model_node, None, None, column_leaves))
+                        continue
+                    if template[0] is not None:
+                        submitted_templates.add(template[0])
+
+                # time budgets are enforced inside the worker, so a runaway model only
+                # holds up its own worker process
+                future = executor.submit(_extract_table_leaves_for_model, task)
+                pending.append((model_node, cache_key, template, future))
+
+            for model_node, cache_key, template, result in pending:
+                if isinstance(result, Future):
+                    result = self._handle_model_result(
+                        result.result(), cache, cache_key, timeouts, metrics, templates, template
+                    )
+                elif isinstance(result, tuple):
+                    column_leaves = templates.get(*template)
+                    if column_leaves is None:
+                        # the model it shares its template with timed out, extract it on its own
+                        column_leaves = self._handle_model_result(
+                            _extract_table_leaves_for_model(result),
+                            cache,
+                            cache_key,
+                            timeouts,
+                            metrics,
+                            templates,
+                            template,
+                        )
+                    else:
+                        self._handle_template_hit(model_node, column_leaves, cache, cache_key, metrics)
+                    result = column_leaves
+                yield model_node, result
 
-    @staticmethod
-    def find_all_related_with_structure(lineage_map, model_node, column, visited=None):
-        model_node = model_node.lower()
-        column = column.lower()
-        if visited is None:
-            visited = set()
+    def iter_lineage_to_direct_parents(
+        self, workers=1, picked_columns=[], cache=None, timeouts=None, metrics=None, templates=None
+    ):
+        """Yield ``(model_node, columns)`` for every selected model, in selection order.
+
+        Each model's sqlglot lineage trees are reduced to parent columns as soon as the
+        model is processed and can be freed before the next model starts, so results can
+        be written out incrementally. With ``workers > 1`` the models are spread across a
+        process pool; each worker only receives the model SQL and its parents' schema,
+        and the results are collected in order so the output matches the serial path.
+        With a ``LineageCache``, models whose SQL and parent schema are unchanged since a
+        previous run are read from the cache instead of being parsed again.
+        With ``LineageTimeouts``, every column and model is extracted within a time budget,
+        and quarantined models are extracted last (or skipped, without columns); results
+        are still yielded in selection order.
+        With ``LineageMetrics``, per-model timings and counts are recorded.
+        With ``picked_columns``, only those (lowercased) columns of every model are resolved.
+        With ``LineageTemplates``, models whose SQL only differs from an already extracted
+        model by the parent relations it reads from reuse that model's lineage.
+        """
+        selected_models = self.selected_models
+        processing_order = selected_models
+        if timeouts is not None:
+            processing_order = timeouts.order_models(selected_models)
+        selected_columns = None
+        if picked_columns:
+            selected_columns = {model_node: set(picked_columns) for model_node in selected_models}
+        results = self._iter_model_table_leaves(
+            workers,
+            cache,
+            timeouts=timeouts,
+            metrics=metrics,
+            selected_columns=selected_columns,
+            templates=templates,
+        )
+        # models processed ahead of their turn in selection order, i.e. the models after a
+        # quarantined one, are held until they can be yielded in order
+        ready = {}
+        position = 0
+        next_result = next(results, None)
+        for model_node in processing_order:
+            # models that are skipped (e.g. python models) are still listed, without columns
+            columns_lineage = {model_node.lower(): {}}
+            if next_result is not None and next_result[0] == model_node:
+                self._reduce_model_table_leaves(
+                    columns_lineage, model_node, next_result[1], metrics, picked_columns
+                )
+                next_result = next(results, None)
+            ready[model_node] = columns_lineage[model_node.lower()]
+            while position < len(selected_models) and selected_models[position] in ready:
+                yield selected_models[position].lower(), ready.pop(selected_models[position])
+                position += 1
+
+    def build_lineage_to_direct_parents(
+        self, workers=1, picked_columns=[], cache=None, timeouts=None, metrics=None, templates=None
+    ):
+        """Extract lineage and reduce it to direct parent columns in one step.
+
+        Equivalent to ``get_columns_lineage_from_sqlglot_lineage_map(build_lineage_map())``,
+        without keeping every model's sqlglot lineage trees in memory at once. See
+        ``iter_lineage_to_direct_parents`` for the arguments.
+        """
+        return dict(
+            self.iter_lineage_to_direct_parents(
+                workers, picked_columns, cache, timeouts, metrics, templates
+            )
+        )
+
+    def update_lineage_from_state(
+        self,
+        previous_manifest_path,
+        previous_catalog_path,
+        lineage_to_direct_parents,
+        lineage_to_direct_children,
+        workers=1,
+        cache=None,
+        timeouts=None,
+        metrics=None,
+        templates=None,
+    ):
+        """Patch the lineage maps of a previous run in place, re-extracting modified models only.
+
+        Models are compared against the previous manifest and catalog with
+        ``state.get_modified_models``; only those are parsed again, and their edges are
+        replaced in both ``lineage_to_direct_parents`` and ``lineage_to_direct_children``.
+        Both maps are then put back in manifest order, so they are written exactly like
+        the output of a full run. Returns the list of re-extracted models.
+        """
+        previous_manifest = loader.load_manifest(previous_manifest_path)
+        previous_catalog = loader.load_catalog(previous_catalog_path)
+        modified, removed = state.get_modified_models(
+            previous_manifest, previous_catalog, self.manifest, self.catalog, self.selected_models
+        )
+        print(f"State comparison: {len(modified)} modified models, {len(removed)} removed models")
+
+        for model_node in modified + removed:
+            state.remove_model_from_lineage(
+                model_node, lineage_to_direct_parents, lineage_to_direct_children
+            )
+        if not modified:
+            return modified
+
+        columns_lineage = {key.lower(): {} for key in modified}
+        for model_node, column_leaves in self._iter_model_table_leaves(
+            workers, cache, modified, timeouts, metrics, templates=templates
+        ):
+            self._reduce_model_table_leaves(columns_lineage, model_node, column_leaves, metrics)
+        for model_node, columns in columns_lineage.items():
+            state.add_model_to_lineage(
+                model_node, columns, lineage_to_direct_parents, lineage_to_direct_children
+            )
+        state.sort_lineage(self.manifest, lineage_to_direct_parents, lineage_to_direct_children)
+        return modified
+
+    def select_columns(self, column_selectors):
+        """Resolve column selectors against the selected models, see ``selector.select_columns``."""
+        return selector.select_columns(
+            self.manifest, self.selected_models, column_selectors, self._get_list_of_columns_for_a_dbt_node
+        )
+
+    def _get_upstream_waves(self, models):
+        # the selected models that ``models`` depend on, transitively, in waves where every
+        # model comes after all of its children, so it is extracted once with every column
+        # its children reference
+        positions = {model_node: position for position, model_node in enumerate(self.selected_models)}
+
+        def get_parents(model_node):
+            model_info = self.manifest["nodes"].get(model_node, {})
+            parents = dict.fromkeys(model_info.get("depends_on", {}).get("nodes", []))
+            return [parent for parent in parents if parent in positions]
+
+        reached = set(models)
+        stack = list(models)
+        while stack:
+            for parent in get_parents(stack.pop()):
+                if parent not in reached:
+                    reached.add(parent)
+                    stack.append(parent)
+
+        remaining_children = dict.fromkeys(reached, 0)
+        for model_node in reached:
+            for parent in get_parents(model_node):
+                remaining_children[parent] += 1
+        wave = [model_node for model_node in reached if not remaining_children[model_node]]
+        while wave:
+            wave.sort(key=lambda x: positions.get(x, len(positions)))
+            yield wave
+            next_wave = []
+            for model_node in wave:
+                for parent in get_parents(model_node):
+                    remaining_children[parent] -= 1
+                    if not remaining_children[parent]:
+                        next_wave.append(parent)
+            wave = next_wave
+
+    def iter_lineage_for_columns(
+        self,
+        selected_columns,
+        upstream=False,
+        workers=1,
+        cache=None,
+        timeouts=None,
+        metrics=None,
+        templates=None,
+    ):
+        """Yield ``(model_node, columns)`` for the models of ``selected_columns``, in selection order.
+
+        ``selected_columns`` maps models to lowercased column names, see ``select_columns``.
+        Only those columns are passed to sqlglot, rather than every catalog column being
+        resolved and the results filtered afterwards. With ``upstream``, the parent columns
+        they reference are resolved too, transitively through the selected models: models
+        are extracted children first, so each one is parsed once, for exactly the columns
+        that were reached. See ``iter_lineage_to_direct_parents`` for the other arguments.
+        """
+        selected_columns = {model_node: set(columns) for model_node, columns in selected_columns.items()}
+        model_ids = {model_node.lower(): model_node for model_node in self.selected_models}
+        if upstream:
+            waves = self._get_upstream_waves(selected_columns)
+        else:
+            waves = [[model_node for model_node in self.selected_models if model_node in selected_columns]]
+
+        columns_lineage = {}
+        for wave in waves:
+            wave = [model_node for model_node in wave if selected_columns.get(model_node)]
+            for model_node in wave:
+                columns_lineage[model_node.lower()] = {}
+            for model_node, column_leaves in self._iter_model_table_leaves(
+                workers, cache, wave, timeouts, metrics, selected_columns, templates
+            ):
+                self._reduce_model_table_leaves(
+                    columns_lineage, model_node, column_leaves, metrics, selected_columns[model_node]
+                )
+                if not upstream:
+                    continue
+                for parents in columns_lineage[model_node.lower()].values():
+                    for parent in parents:
+                        if parent["dbt_node"] in model_ids:
+                            selected_columns.setdefault(model_ids[parent["dbt_node"]], set()).add(
+                                parent["column"]
+                            )
+
+        for model_node in self.selected_models:
+            if model_node.lower() in columns_lineage:
+                yield model_node.lower(), columns_lineage[model_node.lower()]
+
+    def _get_dbt_node_from_table_name(self, table_name):
+        # memoized, as the same few parent tables come up for every column of a model
+        if table_name not in self._dbt_nodes_by_table_name:
+            if table_name in self.node_mapping:
+                dbt_node = self.node_mapping[table_name].lower()
+            else:
+                warnings.warn(f"Table {table_name} not found in node mapping")
+                dbt_node = f"_NOT_FOUND___{table_name.lower()}"
+                # raise ValueError(f"Table {table_name} not found in node mapping")
+            self._dbt_nodes_by_table_name[table_name] = dbt_node
+        return self._dbt_nodes_by_table_name[table_name]
 
-        # Initialize the related structure for the current node and column.
-        related_structure = {}
+    def _get_dbt_node_from_table_leaf(self, column_name, table_name):
+        return {"column": column_name, "dbt_node": self._get_dbt_node_from_table_name(table_name)}
 
-        if model_node in lineage_map and column in lineage_map[model_node]:
-            related_structure = {}  # Start with an empty dict for this level
+    def get_dbt_node_from_sqlglot_table_node(self, node):
+        column_name, table_name = get_table_leaf_from_sqlglot_table_node(node)
+        return self._get_dbt_node_from_table_leaf(column_name, table_name)
+
+    def _get_parent_columns_from_table_leaves(self, model_node, column, table_leaves):
+        # dedupe through a set of (dbt_node, column) pairs rather than a list of dicts, so
+        # wide columns fed by many tables stay linear
+        parent_columns = set()
+        for column_name, table_name in table_leaves:
+            dbt_node = self._get_dbt_node_from_table_name(table_name)
+            if dbt_node != model_node:
+                parent_columns.add((dbt_node, column_name))
+        # sqlglot collects source columns in a set, so the walk order depends on the
+        # interpreter's hash seed; sort to keep the output deterministic across processes
+        parent_columns_list = [
+            {"column": column_name, "dbt_node": dbt_node}
+            for dbt_node, column_name in sorted(parent_columns)
+        ]
+        if not parent_columns_list:
+            warnings.warn(f"No lineage found for {model_node} - {column}")
+        return parent_columns_list
+
+    def _reduce_model_table_leaves(
+        self, columns_lineage, model_node, column_leaves, metrics=None, picked_columns=[]
+    ):
+        start = time.perf_counter()
+        self._add_table_leaves_to_columns_lineage(
+            columns_lineage, model_node, column_leaves, picked_columns
+        )
+        if metrics is not None:
+            metrics.add_reduction(
+                model_node, time.perf_counter() - start, columns_lineage[model_node.lower()]
+            )
 
-            for related_node in lineage_map[model_node][column]:
-                related_model = related_node["dbt_node"]
-                related_column = related_node["column"]
+    def _add_table_leaves_to_columns_lineage(
+        self, columns_lineage, model_node, column_leaves, picked_columns=[]
+    ):
+        model_node = model_node.lower()
+        for column, table_leaves in column_leaves.items():
+            column = column.lower()
+            if picked_columns and column not in picked_columns:
+                continue
+            columns_lineage[model_node][column] = self._get_parent_columns_from_table_leaves(
+                model_node, column, table_leaves
+            )
 
-                if (related_model, related_column) not in visited:
-                    visited.add((related_model, related_column))
+    def get_columns_lineage_from_sqlglot_lineage_map(self, lineage_map, picked_columns=[]):
+        columns_lineage = {key.lower(): {} for key in self.selected_models}
 
-                    # Recursively get the structure for each related node
-                    subsequent_structure = (
-                        DbtColumnLineageExtractor.find_all_related_with_structure(
-                            lineage_map, related_model, related_column, visited
-                        )
-                    )
+        for model_node, columns in lineage_map.items():
+            column_leaves = {
+                column: get_table_leaves_from_sqlglot_lineage_node(node)
+                for column, node in columns.items()
+            }
+            self._add_table_leaves_to_columns_lineage(
+                columns_lineage, model_node, column_leaves, picked_columns
+            )
+        return columns_lineage
 
-                    # Use a structure to show relationships distinctly
-                    if related_model not in related_structure:
-                        related_structure[related_model] = {}
+    def get_lineage_to_direct_children_from_lineage_to_direct_parents(
+        self, lineage_to_direct_parents, children_lineage=None
+    ):
+        # pass children_lineage to add the edges of a partial parents map to it in place
+        return graph.get_lineage_to_direct_children(lineage_to_direct_parents, children_lineage)
 
-                    # Add information about the column lineage
-                    related_structure[related_model][related_column] = {"+": subsequent_structure}
+    @staticmethod
+    def find_all_related(lineage_map, model_node, column, visited=None, max_depth=None):
+        return graph.find_all_related(lineage_map, model_node, column, visited, max_depth)
 
-        return related_structure
+    @staticmethod
+    def find_all_related_with_structure(lineage_map, model_node, column, visited=None, max_depth=None):
+        return graph.find_all_related_with_structure(lineage_map, model_node, column, visited, max_depth)
+
+
+def get_table_leaf_from_sqlglot_table_node(node):
+    if node.source.key != "table":
+        raise ValueError(f"Node source is not a table, but {node.source.key}")
+    column_name = node.name.split(".")[-1].lower()
+    table_name = f"{node.source.catalog}.{node.source.db}.{node.source.name}"
+    return column_name, table_name.lower()
+
+
+def _iter_distinct_lineage_nodes(lineage_node):
+    # depth-first preorder, skipping the subtrees of nodes already walked; iterative, so
+    # deeply nested SQL can't hit the recursion limit of ``Node.walk()``
+    seen = set()
+    stack = [lineage_node]
+    while stack:
+        node = stack.pop()
+        # nodes for the same column of the same select expression have identical subtrees;
+        # node.source can't be part of the key, as sqlglot copies it for every node
+        key = (node.name, id(node.expression))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield node
+        stack.extend(reversed(node.downstream))
+
+
+def get_table_leaves_from_sqlglot_lineage_node(lineage_node):
+    """Reduce a sqlglot lineage tree to its distinct ``(column, full_table_name)`` table leaves,
+    in walk order.
+
+    sqlglot builds a separate subtree every time a CTE or subquery column is referenced, so
+    the same subtree can appear many times; subtrees for a column of a select that was
+    already walked are skipped, and each distinct node is visited once.
+    """
+    table_leaves = {}
+    table_names = {}
+    for node in _iter_distinct_lineage_nodes(lineage_node):
+        if node.source.key == "table":
+            # the table name is formatted once per table expression, not once per leaf
+            source_id = id(node.source)
+            if source_id not in table_names:
+                table_names[source_id] = get_table_leaf_from_sqlglot_table_node(node)[1]
+            table_leaves[(node.name.split(".")[-1].lower(), table_names[source_id])] = None
+    return list(table_leaves)
+
+
+def _extract_table_leaves_for_model(task):
+    # module-level so it can be pickled and run in a worker process
+    profile_path = task[-1]
+    if profile_path is None:
+        return _run_extraction(task)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(_run_extraction, task)
+    finally:
+        profiler.dump_stats(profile_path)
+
+
+def _run_extraction(task):
+    # returns the table leaves of every column, a description of the timeouts hit (or
+    # None), and the timings of every phase, see LineageMetrics
+    model_node, model_sql, schema, columns, dialect, column_timeout, model_timeout, _ = task
+    start = time.monotonic()
+    deadline = start + model_timeout if model_timeout else None
+    engine = ModelLineageEngine(model_sql, schema=schema, dialect=dialect)
+    try:
+        with time_limit(model_timeout):
+            if not columns:
+                columns = engine.get_output_columns()
+            try:
+                engine._build_scope()
+            except SqlglotError:
+                # reported for every column by lineage_for_columns
+                pass
+        lineage_map = engine.lineage_for_columns(
+            columns, model_node=model_node, column_timeout=column_timeout, deadline=deadline
+        )
+        reduce_start = time.perf_counter()
+        column_leaves = {
+            column: get_table_leaves_from_sqlglot_lineage_node(node)
+            for column, node in lineage_map.items()
+        }
+        engine.timings["reduce"] += time.perf_counter() - reduce_start
+    except LineageTimeoutError:
+        seconds = time.monotonic() - start
+        print(f"Timed out processing model {model_node} after {seconds:.1f}s")
+        timeout_result = {"model_timed_out": True, "timed_out_columns": [], "seconds": seconds}
+        return model_node, None, timeout_result, engine.get_metrics(seconds)
+
+    seconds = time.monotonic() - start
+    timeout_result = None
+    if engine.timed_out_columns:
+        timeout_result = {
+            "model_timed_out": False,
+            "timed_out_columns": engine.timed_out_columns,
+            "seconds": seconds,
+        }
+    return model_node, column_leaves, timeout_result, engine.get_metrics(seconds)
+
+
+class ModelLineageEngine:
+    """Resolve column lineage for a single model's SQL.
+
+    The SQL is parsed, qualified and scoped once; every column is then resolved
+    against that shared scope instead of re-running the whole pipeline per column,
+    which is what calling ``sqlglot.lineage.lineage`` with a SQL string does.
+    """
+
+    def __init__(self, model_sql, schema=None, dialect="snowflake"):
+        self.model_sql = model_sql
+        self.schema = schema
+        self.dialect = dialect
+        self._parsed = None
+        self._scope = None
+        self._error = None
+        self.timed_out_columns = []
+        self.error_count = 0
+        self.timings = {"parse": 0.0, "qualify": 0.0, "lineage": 0.0, "reduce": 0.0}
+
+    def get_metrics(self, seconds):
+        metrics = {f"{phase}_seconds": value for phase, value in self.timings.items()}
+        metrics.update(seconds=seconds, error_count=self.error_count)
+        return metrics
+
+    def _parse(self):
+        if self._parsed is None:
+            start = time.perf_counter()
+            try:
+                self._parsed = maybe_parse(self.model_sql, dialect=self.dialect)
+            finally:
+                self.timings["parse"] += time.perf_counter() - start
+        return self._parsed
+
+    def get_output_columns(self):
+        # read column names before qualification, as qualify rewrites the tree in place
+        parsed_sql = self._parse()
+        return [
+            column.name if isinstance(column, exp.Column) else column.alias
+            for select in parsed_sql.find_all(exp.Select)
+            for column in select.expressions
+            if isinstance(column, (exp.Column, exp.Alias))
+        ]
+
+    def _build_scope(self):
+        if self._scope is None and self._error is None:
+            try:
+                parsed_sql = self._parse()
+                start = time.perf_counter()
+                try:
+                    expression = qualify.qualify(
+                        parsed_sql,
+                        dialect=self.dialect,
+                        schema=self.schema,
+                        validate_qualify_columns=False,
+                        identify=False,
+                    )
+                    self._scope = build_scope(expression)
+                finally:
+                    self.timings["qualify"] += time.perf_counter() - start
+                if not self._scope:
+                    raise SqlglotError("Cannot build lineage, sql must be SELECT")
+            except SqlglotError as e:
+                self._error = e
+        if self._error is not None:
+            raise self._error
+        return self._scope
+
+    def lineage_for_column(self, column_name):
+        scope = self._build_scope()
+        start = time.perf_counter()
+        try:
+            return lineage(column_name, scope.expression, dialect=self.dialect, scope=scope)
+        finally:
+            self.timings["lineage"] += time.perf_counter() - start
+
+    def lineage_for_columns(self, columns, model_node=None, column_timeout=None, deadline=None):
+        """Resolve every column, skipping columns that fail or take longer than ``column_timeout``
+        seconds (listed in ``timed_out_columns``). Raises ``LineageTimeoutError`` once
+        ``time.monotonic()`` passes ``deadline``."""
+        lineage_map = {}
+        for column_name in columns:
+            seconds = column_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LineageTimeoutError(f"Model {model_node} ran out of time")
+                if not seconds or remaining < seconds:
+                    seconds = remaining
+            try:
+                with time_limit(seconds):
+                    lineage_map[column_name] = self.lineage_for_column(column_name)
+            except SqlglotError as e:
+                self.error_count += 1
+                print(f"Error processing model {model_node}, column {column_name}: {e}")
+            except LineageTimeoutError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+                print(f"Timed out processing model {model_node}, column {column_name}")
+                self.timed_out_columns.append(column_name)
+        return lineage_map
 
 
 class DBTNodeCatalog:
+    __slots__ = ("database", "schema", "name", "columns")
+
     def __init__(self, node_data):
         self.database = node_data["metadata"]["database"]
         self.schema = node_data["metadata"]["schema"]
@@ -277,11 +845,13 @@ class DBTNodeCatalog:
 
 
 class DBTNodeManifest:
+    __slots__ = ("database", "schema", "name", "columns")
+
     def __init__(self, node_data):
         self.database = node_data["database"]
         self.schema = node_data["schema"]
         self.name = node_data["name"]
-        self.columns = node_data["columns"]
+        self.columns = node_data.get("columns", {})
 
     @property
     def full_table_name(self):
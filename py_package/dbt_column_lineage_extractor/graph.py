@@ -0,0 +1,472 @@
+from array import array
+from collections import deque
+
+
+def iter_related(start, get_neighbors, visited, max_depth=None):
+    """Yield every node reachable from ``start``, marking them in ``visited``.
+
+    Without ``max_depth`` nodes come in depth-first preorder, the order of the former
+    recursive walk; with ``max_depth`` the walk is breadth-first and stops after
+    ``max_depth`` hops. Both walks use explicit stacks/queues, so deep chains can't hit
+    the interpreter's recursion limit.
+    """
+    if max_depth is None:
+        stack = [iter(get_neighbors(start))]
+        while stack:
+            for node in stack[-1]:
+                if node not in visited:
+                    visited.add(node)
+                    yield node
+                    stack.append(iter(get_neighbors(node)))
+                    break
+            else:
+                stack.pop()
+        return
+
+    queue = deque([(start, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        if depth >= max_depth:
+            continue
+        for next_node in get_neighbors(node):
+            if next_node not in visited:
+                visited.add(next_node)
+                yield next_node
+                queue.append((next_node, depth + 1))
+
+
+def get_related_squashed(start, get_neighbors, get_name, visited, max_depth=None):
+    related = {}
+    for node in iter_related(start, get_neighbors, visited, max_depth):
+        model_node, column = get_name(node)
+        related.setdefault(model_node, []).append(column)
+    return related
+
+
+def get_related_structure(start, get_neighbors, get_name, visited, max_depth=None):
+    # without max_depth, depth-first like the former recursive walk: a node is placed under
+    # the first path that reaches it
+    related_structure = {}
+    if max_depth is None:
+        stack = [(iter(get_neighbors(start)), related_structure)]
+        while stack:
+            neighbors, structure = stack[-1]
+            for node in neighbors:
+                if node not in visited:
+                    visited.add(node)
+                    model_node, column = get_name(node)
+                    subsequent_structure = {}
+                    structure.setdefault(model_node, {})[column] = {"+": subsequent_structure}
+                    stack.append((iter(get_neighbors(node)), subsequent_structure))
+                    break
+            else:
+                stack.pop()
+        return related_structure
+
+    # with max_depth, breadth-first by layer, so a node is placed at its shortest distance
+    # and reaches the same nodes as get_related_squashed; a node first reached through a
+    # longer path would be cut off too early by a depth-first walk
+    layer = [(start, related_structure)]
+    for _ in range(max_depth):
+        next_layer = []
+        for node, structure in layer:
+            for next_node in get_neighbors(node):
+                if next_node not in visited:
+                    visited.add(next_node)
+                    model_node, column = get_name(next_node)
+                    subsequent_structure = {}
+                    structure.setdefault(model_node, {})[column] = {"+": subsequent_structure}
+                    next_layer.append((next_node, subsequent_structure))
+        layer = next_layer
+    return related_structure
+
+
+def get_lineage_to_direct_children(lineage_to_direct_parents, children_lineage=None):
+    """Invert a parents map into a children map, see
+    ``DbtColumnLineageExtractor.get_lineage_to_direct_children_from_lineage_to_direct_parents``."""
+    # pass children_lineage to add the edges of a partial parents map to it in place
+    if children_lineage is None:
+        children_lineage = {}
+
+    for child_model, columns in lineage_to_direct_parents.items():
+        child_model = child_model.lower()
+        for child_column, parents in columns.items():
+            child_column = child_column.lower()
+            for parent in parents:
+                parent_model = parent["dbt_node"].lower()
+                parent_column = parent["column"].lower()
+
+                if parent_model not in children_lineage:
+                    children_lineage[parent_model] = {}
+
+                if parent_column not in children_lineage[parent_model]:
+                    children_lineage[parent_model][parent_column] = []
+
+                children_lineage[parent_model][parent_column].append(
+                    {"column": child_column, "dbt_node": child_model}
+                )
+    return children_lineage
+
+
+def find_all_related(lineage_map, model_node, column, visited=None, max_depth=None):
+    """Squashed ancestors (or descendants) of a column in a lineage dict, see
+    ``DbtColumnLineageExtractor.find_all_related``."""
+    if visited is None:
+        visited = set()
+    return get_related_squashed(
+        (model_node.lower(), column.lower()),
+        get_lineage_map_neighbors(lineage_map),
+        lambda node: node,
+        visited,
+        max_depth,
+    )
+
+
+def find_all_related_with_structure(lineage_map, model_node, column, visited=None, max_depth=None):
+    """Structured ancestors (or descendants) of a column in a lineage dict, see
+    ``DbtColumnLineageExtractor.find_all_related_with_structure``."""
+    if visited is None:
+        visited = set()
+    return get_related_structure(
+        (model_node.lower(), column.lower()),
+        get_lineage_map_neighbors(lineage_map),
+        lambda node: node,
+        visited,
+        max_depth,
+    )
+
+
+def get_lineage_map_neighbors(lineage_map):
+    """Neighbor function over a lineage dict, with ``(dbt_node, column)`` tuples as nodes."""
+
+    def get_neighbors(node):
+        model_node, column = node
+        if model_node in lineage_map and column in lineage_map[model_node]:
+            return [
+                (related_node["dbt_node"], related_node["column"])
+                for related_node in lineage_map[model_node][column]
+            ]
+        return []
+
+    return get_neighbors
+
+
+def _build_csr(node_count, sources, targets):
+    # stable counting sort of the edges by source, keeping the insertion order within a source
+    offsets = array("q", bytes(8 * (node_count + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(node_count):
+        offsets[i + 1] += offsets[i]
+    positions = array("q", offsets)
+    adjacency = array("q", bytes(8 * len(targets)))
+    for source, target in zip(sources, targets):
+        adjacency[positions[source]] = target
+        positions[source] += 1
+    return offsets, adjacency
+
+
+class ColumnLineageGraph:
+    """An indexed, immutable column lineage graph built once from a lineage map.
+
+    ``(dbt_node, column)`` pairs are interned to integer ids and the edges are stored as
+    CSR arrays (``offsets``/``adjacency``), so a query only touches the part of the graph
+    it reaches. Built from ``lineage_to_direct_parents`` it answers ancestor queries;
+    ``reversed()`` answers descendant queries without loading the children map. Results
+    have the same shapes as ``DbtColumnLineageExtractor.find_all_related`` and
+    ``find_all_related_with_structure``.
+    """
+
+    def __init__(self, lineage_map=None):
+        self.node_names = []
+        self.column_names = []
+        self.pair_nodes = array("q")
+        self.pair_columns = array("q")
+        self._node_ids = {}
+        self._column_ids = {}
+        self._pair_ids = {}
+        self._edge_sources = array("q")
+        self._edge_targets = array("q")
+        self.offsets = array("q", [0])
+        self.adjacency = array("q")
+        # memoized strongly connected components and their transitive closures, see
+        # find_all_related_batch
+        self._components = {}
+        self._closures = []
+
+        if lineage_map is not None:
+            for model_node, columns in lineage_map.items():
+                for column, related_nodes in columns.items():
+                    source = self._intern(model_node, column)
+                    for related_node in related_nodes:
+                        target = self._intern(related_node["dbt_node"], related_node["column"])
+                        self._edge_sources.append(source)
+                        self._edge_targets.append(target)
+            self.offsets, self.adjacency = _build_csr(
+                len(self.pair_nodes),
+                self._edge_sources,
+                self._edge_targets,
+            )
+
+    def _intern(self, model_node, column):
+        model_node, column = model_node.lower(), column.lower()
+        node_id = self._node_ids.get(model_node)
+        if node_id is None:
+            node_id = self._node_ids[model_node] = len(self.node_names)
+            self.node_names.append(model_node)
+        column_id = self._column_ids.get(column)
+        if column_id is None:
+            column_id = self._column_ids[column] = len(self.column_names)
+            self.column_names.append(column)
+        pair_id = self._pair_ids.get((node_id, column_id))
+        if pair_id is None:
+            pair_id = self._pair_ids[(node_id, column_id)] = len(self.pair_nodes)
+            self.pair_nodes.append(node_id)
+            self.pair_columns.append(column_id)
+        return pair_id
+
+    def __len__(self):
+        return len(self.pair_nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.adjacency)
+
+    def get_pair_id(self, model_node, column):
+        node_id = self._node_ids.get(model_node.lower())
+        column_id = self._column_ids.get(column.lower())
+        return self._pair_ids.get((node_id, column_id))
+
+    def get_name(self, pair_id):
+        return self.node_names[self.pair_nodes[pair_id]], self.column_names[self.pair_columns[pair_id]]
+
+    def get_neighbors(self, pair_id):
+        return self.adjacency[self.offsets[pair_id]:self.offsets[pair_id + 1]]
+
+    def reversed(self):
+        """Return the graph with every edge reversed, sharing the interned names."""
+        graph = ColumnLineageGraph()
+        graph.node_names, graph.column_names = self.node_names, self.column_names
+        graph.pair_nodes, graph.pair_columns = self.pair_nodes, self.pair_columns
+        graph._node_ids, graph._column_ids, graph._pair_ids = (
+            self._node_ids,
+            self._column_ids,
+            self._pair_ids,
+        )
+        graph._edge_sources, graph._edge_targets = self._edge_targets, self._edge_sources
+        # keep the lineage map's edge order, so the result matches the inverted map built by
+        # get_lineage_to_direct_children_from_lineage_to_direct_parents
+        graph.offsets, graph.adjacency = _build_csr(
+            len(self.pair_nodes),
+            graph._edge_sources,
+            graph._edge_targets,
+        )
+        return graph
+
+    def find_all_related(self, model_node, column, max_depth=None):
+        start = self.get_pair_id(model_node, column)
+        if start is None:
+            return {}
+        return get_related_squashed(start, self.get_neighbors, self.get_name, set(), max_depth)
+
+    def find_all_related_with_structure(self, model_node, column, max_depth=None):
+        start = self.get_pair_id(model_node, column)
+        if start is None:
+            return {}
+        return get_related_structure(start, self.get_neighbors, self.get_name, set(), max_depth)
+
+    def _find_components(self, start):
+        # iterative Tarjan over the part of the graph reachable from start that has no
+        # component yet; components are completed sinks-first, so each closure can be
+        # built right away from the closures of the components it points to
+        indices = {start: 0}
+        lowlinks = {start: 0}
+        stack = [start]
+        on_stack = {start}
+        work = [(start, iter(self.get_neighbors(start)))]
+        while work:
+            node, neighbors = work[-1]
+            for next_node in neighbors:
+                if next_node in self._components:
+                    continue
+                if next_node not in indices:
+                    indices[next_node] = lowlinks[next_node] = len(indices)
+                    stack.append(next_node)
+                    on_stack.add(next_node)
+                    work.append((next_node, iter(self.get_neighbors(next_node))))
+                    break
+                if next_node in on_stack:
+                    lowlinks[node] = min(lowlinks[node], indices[next_node])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+                if lowlinks[node] != indices[node]:
+                    continue
+
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                component = len(self._closures)
+                for member in members:
+                    self._components[member] = component
+                closure = set(members)
+                for member in members:
+                    for next_node in self.get_neighbors(member):
+                        next_component = self._components[next_node]
+                        if next_component != component:
+                            closure.update(self._closures[next_component])
+                self._closures.append(frozenset(closure))
+
+    def _get_closure_of_successors(self, pair_id):
+        if pair_id not in self._components:
+            self._find_components(pair_id)
+        related = set()
+        for next_node in self.get_neighbors(pair_id):
+            related.update(self._closures[self._components[next_node]])
+        return related
+
+    def find_all_related_batch(self, queries):
+        """Answer many squashed lineage queries, yielding ``(model_node, column, related)``.
+
+        Cycles are condensed into strongly connected components, and the transitive closure
+        of every component is computed once, in topological order, and memoized on the graph,
+        so upstream subgraphs shared between queries (and between calls) are only walked
+        once. ``related`` has the same content as ``find_all_related``, with the columns in
+        index order rather than in walk order.
+        """
+        for model_node, column in queries:
+            start = self.get_pair_id(model_node, column)
+            related = {}
+            if start is not None:
+                for pair_id in sorted(self._get_closure_of_successors(start)):
+                    related_model, related_column = self.get_name(pair_id)
+                    related.setdefault(related_model, []).append(related_column)
+            yield model_node, column, related
+
+
+class CompactLineage:
+    """Direct parents lineage of an extraction run, held in interned, array-backed form.
+
+    A ``lineage_to_direct_parents`` dict stores every edge as its own ``{"column",
+    "dbt_node"}`` dict with its own strings, which dominates memory on large projects. Here
+    node and column names are interned once to integer ids, and the columns and edges of
+    every model are appended to flat arrays, in insertion order: ``model_offsets`` slices
+    ``column_ids`` by model, and ``edge_offsets`` slices ``edge_nodes``/``edge_columns`` by
+    column. The usual dict shapes are only produced at the output boundary, one model at a
+    time, by ``iter_parents`` and ``iter_children``; children are inverted from the parents
+    on demand, in the order ``get_lineage_to_direct_children`` builds them.
+    """
+
+    __slots__ = (
+        "node_names",
+        "column_names",
+        "_node_ids",
+        "_column_ids",
+        "model_ids",
+        "model_offsets",
+        "column_ids",
+        "edge_offsets",
+        "edge_nodes",
+        "edge_columns",
+    )
+
+    def __init__(self):
+        self.node_names = []
+        self.column_names = []
+        self._node_ids = {}
+        self._column_ids = {}
+        self.model_ids = array("q")
+        self.model_offsets = array("q", [0])
+        self.column_ids = array("q")
+        self.edge_offsets = array("q", [0])
+        self.edge_nodes = array("q")
+        self.edge_columns = array("q")
+
+    @staticmethod
+    def _intern(names, ids, name):
+        name_id = ids.get(name)
+        if name_id is None:
+            name_id = ids[name] = len(names)
+            names.append(name)
+        return name_id
+
+    def add_model(self, model_node, columns):
+        """Append the ``{column: [{"column", "dbt_node"}]}`` parents of a model not added yet."""
+        node_names, node_ids = self.node_names, self._node_ids
+        column_names, column_ids = self.column_names, self._column_ids
+        self.model_ids.append(self._intern(node_names, node_ids, model_node))
+        for column, parents in columns.items():
+            self.column_ids.append(self._intern(column_names, column_ids, column))
+            for parent in parents:
+                self.edge_nodes.append(self._intern(node_names, node_ids, parent["dbt_node"]))
+                self.edge_columns.append(self._intern(column_names, column_ids, parent["column"]))
+            self.edge_offsets.append(len(self.edge_nodes))
+        self.model_offsets.append(len(self.column_ids))
+
+    def __len__(self):
+        return len(self.model_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_nodes)
+
+    def iter_parents(self):
+        """Yield ``(model_node, columns)`` in the shape of ``lineage_to_direct_parents``."""
+        node_names, column_names = self.node_names, self.column_names
+        model_offsets, edge_offsets = self.model_offsets, self.edge_offsets
+        for model_index, model_id in enumerate(self.model_ids):
+            columns = {}
+            for column_index in range(model_offsets[model_index], model_offsets[model_index + 1]):
+                columns[column_names[self.column_ids[column_index]]] = [
+                    {
+                        "column": column_names[self.edge_columns[edge]],
+                        "dbt_node": node_names[self.edge_nodes[edge]],
+                    }
+                    for edge in range(edge_offsets[column_index], edge_offsets[column_index + 1])
+                ]
+            yield node_names[model_id], columns
+
+    def iter_children(self):
+        """Yield ``(parent_node, columns)`` in the shape of ``lineage_to_direct_children``."""
+        node_keys = [name.lower() for name in self.node_names]
+        column_keys = [name.lower() for name in self.column_names]
+        # every parent column gets a slot in order of first appearance, and the edges are
+        # sorted by slot, keeping their order within a slot
+        slots = {}
+        model_slots = {}
+        edge_slots = array("q", bytes(8 * self.edge_count))
+        edge_children = array("q", bytes(8 * self.edge_count))
+        child_models = array("q", bytes(8 * len(self.column_ids)))
+        for model_index, model_id in enumerate(self.model_ids):
+            for column_index in range(self.model_offsets[model_index], self.model_offsets[model_index + 1]):
+                child_models[column_index] = model_id
+                for edge in range(self.edge_offsets[column_index], self.edge_offsets[column_index + 1]):
+                    key = (node_keys[self.edge_nodes[edge]], column_keys[self.edge_columns[edge]])
+                    slot = slots.get(key)
+                    if slot is None:
+                        slot = slots[key] = len(slots)
+                        model_slots.setdefault(key[0], []).append(slot)
+                    edge_slots[edge] = slot
+                    edge_children[edge] = column_index
+        slot_columns = [column for _, column in slots]
+        del slots
+        offsets, edges = _build_csr(len(slot_columns), edge_slots, edge_children)
+        del edge_slots, edge_children
+
+        for parent_node, parent_slots in model_slots.items():
+            columns = {}
+            for slot in parent_slots:
+                columns[slot_columns[slot]] = [
+                    {
+                        "column": column_keys[self.column_ids[column_index]],
+                        "dbt_node": node_keys[child_models[column_index]],
+                    }
+                    for column_index in edges[offsets[slot]:offsets[slot + 1]]
+                ]
+            yield parent_node, columns
@@ -0,0 +1,180 @@
+from collections.abc import Mapping
+
+from .extractor import ModelLineageEngine, get_table_leaves_from_sqlglot_lineage_node
+
+
+class LazyLineageResolver:
+    """Resolve column lineage on demand, straight from manifest and catalog.
+
+    Instead of extracting the whole project up front, lineage is extracted only for the
+    models a query actually reaches, one column at a time, and every result is memoized.
+    ``lineage_to_direct_parents`` and ``lineage_to_direct_children`` behave like the
+    dicts written by ``dbt_column_lineage_direct``, so they can be passed to
+    ``DbtColumnLineageExtractor.find_all_related`` and
+    ``find_all_related_with_structure``::
+
+        resolver = LazyLineageResolver(extractor)
+        DbtColumnLineageExtractor.find_all_related(
+            resolver.lineage_to_direct_parents, "model.jaffle_shop.orders", "amount"
+        )
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self._model_nodes = {}
+        for model_node in extractor.selected_models:
+            model_info = extractor.manifest["nodes"].get(model_node)
+            if model_info is not None:
+                self._model_nodes[model_node.lower()] = model_node
+        self._child_index = None
+        self._engines = {}
+        self._columns = {}
+        self._parents = {}
+        self._children = {}
+        self.lineage_to_direct_parents = _LazyLineageToDirectParents(self)
+        self.lineage_to_direct_children = _LazyLineageToDirectChildren(self)
+
+    @property
+    def extracted_models(self):
+        return list(self._engines)
+
+    def _is_extractable(self, model_node):
+        model_info = self.extractor.manifest["nodes"][model_node]
+        return model_info["resource_type"] == "model" and not model_info["path"].endswith(".py")
+
+    def _get_engine(self, model_node):
+        if model_node not in self._engines:
+            model_info = self.extractor.manifest["nodes"][model_node]
+            schema = self.extractor.schema_index.get_mapping_schema(
+                model_info["depends_on"]["nodes"], self.extractor.dialect
+            )
+            self._engines[model_node] = ModelLineageEngine(
+                model_info["compiled_code"], schema=schema, dialect=self.extractor.dialect
+            )
+        return self._engines[model_node]
+
+    def get_columns(self, model_node):
+        """Return the lowercased columns of a model, mapped to their catalog spelling."""
+        if model_node not in self._columns:
+            columns = []
+            if self._is_extractable(model_node):
+                columns = self.extractor._get_list_of_columns_for_a_dbt_node(model_node)
+                if not columns:
+                    columns = self._get_engine(model_node).get_output_columns()
+            self._columns[model_node] = {column.lower(): column for column in columns}
+        return self._columns[model_node]
+
+    def get_direct_parents(self, model_node, column):
+        key = (model_node, column)
+        if key not in self._parents:
+            column_name = self.get_columns(model_node)[column]
+            lineage_map = self._get_engine(model_node).lineage_for_columns(
+                [column_name], model_node=model_node
+            )
+            parents = []
+            if column_name in lineage_map:
+                table_leaves = get_table_leaves_from_sqlglot_lineage_node(lineage_map[column_name])
+                parents = self.extractor._get_parent_columns_from_table_leaves(
+                    model_node.lower(), column, table_leaves
+                )
+            self._parents[key] = parents
+        return self._parents[key]
+
+    def get_child_models(self, node):
+        if self._child_index is None:
+            self._child_index = {}
+            for model_node in self._model_nodes.values():
+                model_info = self.extractor.manifest["nodes"][model_node]
+                for parent in model_info["depends_on"]["nodes"]:
+                    self._child_index.setdefault(parent.lower(), []).append(model_node)
+        return self._child_index.get(node, [])
+
+    def get_direct_children(self, node, column):
+        key = (node, column)
+        if key not in self._children:
+            children = []
+            for child_model in self.get_child_models(node):
+                for child_column in self.get_columns(child_model):
+                    for parent in self.get_direct_parents(child_model, child_column):
+                        if parent["dbt_node"] == node and parent["column"] == column:
+                            children.append({"column": child_column, "dbt_node": child_model.lower()})
+            self._children[key] = children
+        return self._children[key]
+
+
+class _LazyLineageToDirectParents(Mapping):
+    def __init__(self, resolver):
+        self._resolver = resolver
+
+    def __getitem__(self, model_node):
+        return _LazyModelParents(self._resolver, self._resolver._model_nodes[model_node])
+
+    def __iter__(self):
+        return iter(self._resolver._model_nodes)
+
+    def __len__(self):
+        return len(self._resolver._model_nodes)
+
+
+class _LazyModelParents(Mapping):
+    def __init__(self, resolver, model_node):
+        self._resolver = resolver
+        self._model_node = model_node
+
+    def __getitem__(self, column):
+        if column not in self._resolver.get_columns(self._model_node):
+            raise KeyError(column)
+        return self._resolver.get_direct_parents(self._model_node, column)
+
+    def __iter__(self):
+        return iter(self._resolver.get_columns(self._model_node))
+
+    def __len__(self):
+        return len(self._resolver.get_columns(self._model_node))
+
+
+class _LazyLineageToDirectChildren(Mapping):
+    def __init__(self, resolver):
+        self._resolver = resolver
+
+    def __getitem__(self, node):
+        if not self._resolver.get_child_models(node):
+            raise KeyError(node)
+        return _LazyNodeChildren(self._resolver, node)
+
+    def __iter__(self):
+        self._resolver.get_child_models("")
+        return iter(self._resolver._child_index)
+
+    def __len__(self):
+        self._resolver.get_child_models("")
+        return len(self._resolver._child_index)
+
+
+class _LazyNodeChildren(Mapping):
+    # the columns of a parent node are only known once its children are extracted, so
+    # membership is decided by whether the column has any child edge
+    def __init__(self, resolver, node):
+        self._resolver = resolver
+        self._node = node
+
+    def __getitem__(self, column):
+        children = self._resolver.get_direct_children(self._node, column)
+        if not children:
+            raise KeyError(column)
+        return children
+
+    def __contains__(self, column):
+        return bool(self._resolver.get_direct_children(self._node, column))
+
+    def __iter__(self):
+        columns = {}
+        for child_model in self._resolver.get_child_models(self._node):
+            for child_column in self._resolver.get_columns(child_model):
+                for parent in self._resolver.get_direct_parents(child_model, child_column):
+                    if parent["dbt_node"] == self._node:
+                        columns[parent["column"]] = None
+        return iter(columns)
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,69 @@
+from . import utils
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def _project_manifest_node(node):
+    projected = {
+        "resource_type": node.get("resource_type"),
+        "path": node.get("path", ""),
+        "original_file_path": node.get("original_file_path", ""),
+        "database": node.get("database"),
+        "schema": node.get("schema"),
+        "name": node.get("name"),
+        # the name the node is rendered as in compiled SQL, see LineageTemplates
+        "relation_name": node.get("relation_name"),
+        "tags": node.get("tags", []),
+        "depends_on": {"nodes": list(node.get("depends_on", {}).get("nodes", []))},
+    }
+    # the compiled SQL is by far the largest field, and only models are parsed
+    if projected["resource_type"] == "model":
+        projected["compiled_code"] = node.get("compiled_code")
+    return projected
+
+
+def _project_catalog_node(node):
+    metadata = node["metadata"]
+    return {
+        "metadata": {
+            "database": metadata["database"],
+            "schema": metadata["schema"],
+            "name": metadata["name"],
+        },
+        "columns": {
+            col_name: {"type": col_info["type"]} for col_name, col_info in node["columns"].items()
+        },
+    }
+
+
+def _load_projected(file_path, keys, project):
+    if ijson is None:
+        data = utils.read_json(file_path)
+        return {key: {k: project(v) for k, v in data.get(key, {}).items()} for key in keys}
+
+    projected = {}
+    for key in keys:
+        # one pass per top-level key; only a single node is fully materialized at a time
+        with open(file_path, "rb") as file:
+            projected[key] = {k: project(v) for k, v in ijson.kvitems(file, key)}
+    return projected
+
+
+def load_manifest(file_path):
+    """Load the ``nodes`` and ``sources`` of a dbt manifest, keeping only the fields the
+    extractor uses.
+
+    When ``ijson`` is installed the file is parsed incrementally, so docs, macros and the
+    unused fields of every node are never held in memory together; otherwise the whole
+    file is read first and projected afterwards.
+    """
+    return _load_projected(file_path, ("nodes", "sources"), _project_manifest_node)
+
+
+def load_catalog(file_path):
+    """Load the ``nodes`` and ``sources`` of a dbt catalog, keeping only relation names and
+    column types. See ``load_manifest``."""
+    return _load_projected(file_path, ("nodes", "sources"), _project_catalog_node)
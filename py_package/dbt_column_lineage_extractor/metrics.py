@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+import time
+
+_PHASES = ("parse", "qualify", "lineage", "reduce")
+
+_FIELDS = (
+    "model_node",
+    "cached",
+    "template_hit",
+    "seconds",
+    "parse_seconds",
+    "qualify_seconds",
+    "lineage_seconds",
+    "reduce_seconds",
+    "sql_size",
+    "column_count",
+    "parent_count",
+    "error_count",
+    "not_found_count",
+)
+
+
+class LineageMetrics:
+    """Per-model timings and counts of an extraction run.
+
+    For every extracted model it records the wall time and how it splits between
+    parsing, qualification, sqlglot lineage and the reduction of lineage trees to parent
+    columns, along with the size of the compiled SQL, the number of columns and parents,
+    the columns that failed and the parent tables not found in the manifest
+    (``_NOT_FOUND___`` nodes). Models listed in ``profile_models`` are additionally run
+    under ``cProfile``, with the stats written to ``<profile_dir>/<model_node>.prof``.
+    """
+
+    def __init__(self, profile_models=(), profile_dir="."):
+        self.profile_models = set(profile_models)
+        self.profile_dir = profile_dir
+        self.models = {}
+        self.started_at = time.perf_counter()
+
+    def get_profile_path(self, model_node):
+        if model_node not in self.profile_models:
+            return None
+        return os.path.join(self.profile_dir, f"{model_node}.prof")
+
+    def add_task(self, model_node, model_sql, parents):
+        self.models[model_node] = dict.fromkeys(_FIELDS, 0)
+        self.models[model_node].update(
+            model_node=model_node,
+            cached=False,
+            template_hit=False,
+            sql_size=len(model_sql or ""),
+            parent_count=len(parents),
+        )
+
+    def add_extraction(self, model_node, extraction_metrics):
+        """Record the metrics returned by ``_extract_table_leaves_for_model``; ``None`` for a
+        cache hit."""
+        record = self.models[model_node]
+        if extraction_metrics is None:
+            record["cached"] = True
+            return
+        for phase in _PHASES:
+            record[f"{phase}_seconds"] += extraction_metrics[f"{phase}_seconds"]
+        record["error_count"] = extraction_metrics["error_count"]
+        record["seconds"] += extraction_metrics["seconds"]
+
+    def add_template_hit(self, model_node):
+        # lineage shared from a model with the same SQL template, see LineageTemplates
+        self.models[model_node]["template_hit"] = True
+
+    def add_reduction(self, model_node, seconds, columns):
+        if model_node not in self.models:
+            return
+        record = self.models[model_node]
+        record["reduce_seconds"] += seconds
+        record["seconds"] += seconds
+        record["column_count"] = len(columns)
+        record["not_found_count"] = sum(
+            parent["dbt_node"].startswith("_NOT_FOUND___")
+            for parents in columns.values()
+            for parent in parents
+        )
+
+    def get_totals(self):
+        records = list(self.models.values())
+        totals = {
+            "run_seconds": time.perf_counter() - self.started_at,
+            "models": len(records),
+            "cached_models": sum(record["cached"] for record in records),
+            "template_models": sum(record["template_hit"] for record in records),
+        }
+        for field in _FIELDS[3:]:
+            totals[field] = sum(record[field] for record in records)
+        return totals
+
+    def get_slowest(self, top_n=10):
+        return sorted(self.models.values(), key=lambda record: record["seconds"], reverse=True)[:top_n]
+
+    def report(self, top_n=10):
+        totals = self.get_totals()
+        lines = [
+            f"Extraction metrics: {totals['models']} models ({totals['cached_models']} cached, "
+            f"{totals['template_models']} from SQL templates) "
+            f"in {totals['run_seconds']:.2f}s; "
+            + ", ".join(f"{phase} {totals[f'{phase}_seconds']:.2f}s" for phase in _PHASES)
+            + f"; {totals['error_count']} column errors, "
+            f"{totals['not_found_count']} parents not found",
+            f"Top {top_n} slowest models:",
+        ]
+        for record in self.get_slowest(top_n):
+            lines.append(
+                f"  {record['seconds']:8.3f}s  {record['model_node']} "
+                f"(parse {record['parse_seconds']:.3f}s, qualify {record['qualify_seconds']:.3f}s, "
+                f"lineage {record['lineage_seconds']:.3f}s, reduce {record['reduce_seconds']:.3f}s, "
+                f"{record['sql_size']} chars, {record['column_count']} columns, "
+                f"{record['parent_count']} parents)"
+            )
+        return "\n".join(lines)
+
+    def write(self, file_path):
+        """Write the per-model metrics as CSV if ``file_path`` ends with ``.csv``, else as
+        JSON together with the run totals."""
+        if file_path.endswith(".csv"):
+            with open(file_path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.models.values())
+            return
+        with open(file_path, "w") as file:
+            json.dump({"totals": self.get_totals(), "models": list(self.models.values())}, file, indent=4)
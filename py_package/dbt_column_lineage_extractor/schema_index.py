@@ -0,0 +1,86 @@
+import warnings
+from collections import OrderedDict
+
+from sqlglot.schema import MappingSchema
+
+
+class SchemaIndex:
+    """Normalized schema of every catalog node, built once when the catalog is loaded.
+
+    ``get_schema_dict`` returns the nested ``{database: {schema: {table: {column: type}}}}``
+    dict sqlglot expects, restricted to a model's parents, and ``get_mapping_schema`` the
+    equivalent ``sqlglot.schema.MappingSchema``. Both are cached per parent list, so hub
+    models aren't rebuilt and re-normalized for each of their children. Each cache keeps
+    the ``cache_size`` most recently used parent lists, so memory stays bounded on
+    projects with many distinct parent sets. The returned objects are shared and must be
+    treated as read-only.
+    """
+
+    def __init__(self, catalog, cache_size=1024):
+        self._tables = {}
+        for key in ("nodes", "sources"):
+            for node_id, node in catalog.get(key, {}).items():
+                metadata = node["metadata"]
+                column_types = {
+                    col_name: col_info["type"] for col_name, col_info in node["columns"].items()
+                }
+                self._tables[node_id] = (
+                    key,
+                    metadata["database"],
+                    metadata["schema"],
+                    metadata["name"],
+                    column_types,
+                )
+        self.cache_size = cache_size
+        self._schema_dicts = OrderedDict()
+        self._mapping_schemas = OrderedDict()
+
+    def __contains__(self, node_id):
+        return node_id in self._tables
+
+    def get_column_types(self, node_id):
+        # None for nodes missing from the catalog
+        return self._tables[node_id][4] if node_id in self._tables else None
+
+    def _get_cached(self, cache, key):
+        # least recently used entries are evicted first
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        return None
+
+    def _put_cached(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def get_schema_dict(self, parents):
+        parents = tuple(parents)
+        schema_dict = self._get_cached(self._schema_dicts, parents)
+        if schema_dict is None:
+            for parent in parents:
+                if parent not in self._tables:
+                    warnings.warn(f"Parent model {parent} not found in catalog")
+            # catalog nodes before sources, matching the order of a catalog slice
+            tables = [self._tables[parent] for parent in dict.fromkeys(parents) if parent in self._tables]
+            tables.sort(key=lambda table: table[0] != "nodes")
+
+            schema_dict = {}
+            for _, database, schema, name, column_types in tables:
+                tables_dict = schema_dict.setdefault(database, {}).setdefault(schema, {})
+                if name in tables_dict:
+                    tables_dict[name] = {**tables_dict[name], **column_types}
+                else:
+                    tables_dict[name] = column_types
+            self._put_cached(self._schema_dicts, parents, schema_dict)
+        return schema_dict
+
+    def get_mapping_schema(self, parents, dialect):
+        key = (tuple(parents), dialect)
+        mapping_schema = self._get_cached(self._mapping_schemas, key)
+        if mapping_schema is None:
+            mapping_schema = self._put_cached(
+                self._mapping_schemas, key, MappingSchema(self.get_schema_dict(parents), dialect=dialect)
+            )
+        return mapping_schema
@@ -0,0 +1,140 @@
+import fnmatch
+import re
+import warnings
+from collections import deque
+
+# [n]+selector[+n], e.g. "+orders", "orders+", "2+orders", "orders+1", "+tag:finance+"
+_GRAPH_OPERATOR_PATTERN = re.compile(r"^(?:(?P<parents>\d*)\+)?(?P<selector>.+?)(?:\+(?P<children>\d*))?$")
+
+
+def _get_child_index(manifest):
+    child_index = {}
+    for node, info in manifest["nodes"].items():
+        for parent in info.get("depends_on", {}).get("nodes", []):
+            child_index.setdefault(parent, []).append(node)
+    return child_index
+
+
+def _match_path(info, path):
+    path = path.rstrip("/")
+    for node_path in (info.get("original_file_path"), info.get("path")):
+        if not node_path:
+            continue
+        if node_path == path or node_path.startswith(f"{path}/") or fnmatch.fnmatch(node_path, path):
+            return True
+    return False
+
+
+def _match_nodes(manifest, selector):
+    nodes = manifest["nodes"]
+    if selector.startswith("tag:"):
+        tag = selector[len("tag:"):]
+        return [node for node, info in nodes.items() if tag in info.get("tags", [])]
+    if selector.startswith("path:"):
+        path = selector[len("path:"):]
+        return [node for node, info in nodes.items() if _match_path(info, path)]
+    if selector in nodes:
+        return [selector]
+    return [
+        node
+        for node, info in nodes.items()
+        if info.get("name") == selector or fnmatch.fnmatch(node, selector)
+    ]
+
+
+def _walk(start_nodes, edges, depth):
+    # iterative breadth-first walk, bounded by depth when one is given
+    reached = set()
+    queue = deque((node, 0) for node in start_nodes)
+    seen = set(start_nodes)
+    while queue:
+        node, distance = queue.popleft()
+        if depth is not None and distance >= depth:
+            continue
+        for next_node in edges.get(node, []):
+            if next_node not in seen:
+                seen.add(next_node)
+                reached.add(next_node)
+                queue.append((next_node, distance + 1))
+    return reached
+
+
+def select_models(manifest, selectors):
+    """Resolve dbt-style node selectors to a list of model unique ids, in manifest order.
+
+    Each selector is a model unique id, a model name, a unique id glob, ``tag:<tag>`` or
+    ``path:<path>``, optionally wrapped in graph operators: ``+x`` adds all ancestors of
+    ``x``, ``x+`` all descendants, and ``n+x`` / ``x+n`` limit the walk to ``n`` levels.
+    The selected sets of all selectors are unioned. Ancestors are resolved from
+    ``depends_on.nodes`` and descendants from a child index built from it; non-model
+    nodes are walked through, and only selected when given explicitly by unique id.
+
+    Unique ids that match nothing are kept as given, as was the case before selectors
+    were supported.
+    """
+    nodes = manifest["nodes"]
+    parent_index = {node: info.get("depends_on", {}).get("nodes", []) for node, info in nodes.items()}
+    child_index = None
+    selected = set()
+    explicit = set()
+    unmatched = []
+
+    for raw_selector in selectors:
+        match = _GRAPH_OPERATOR_PATTERN.match(raw_selector)
+        parents, selector, children = match.group("parents", "selector", "children")
+        matched_nodes = _match_nodes(manifest, selector)
+        if not matched_nodes:
+            warnings.warn(f"Selector {raw_selector} does not match any node")
+            if parents is None and children is None and ":" not in selector:
+                unmatched.append(raw_selector)
+            continue
+
+        selected.update(matched_nodes)
+        if parents is None and children is None and selector in nodes:
+            explicit.add(selector)
+        if parents is not None:
+            selected.update(_walk(matched_nodes, parent_index, int(parents) if parents else None))
+        if children is not None:
+            if child_index is None:
+                child_index = _get_child_index(manifest)
+            selected.update(_walk(matched_nodes, child_index, int(children) if children else None))
+
+    selected_models = [
+        node
+        for node, info in nodes.items()
+        if node in explicit or (node in selected and info["resource_type"] == "model")
+    ]
+    return selected_models + unmatched
+
+
+def select_columns(manifest, models, selectors, get_columns):
+    """Resolve column selectors to ``{model unique id: set of lowercased column names}``.
+
+    Each selector is ``<model selector>:<column glob>``, with any model selector accepted
+    by ``select_models`` (e.g. ``orders:amount``, ``+orders:*_id`` or ``tag:pii:*email*``),
+    or a bare column glob matched in every model. Only models in ``models`` are selected.
+    Globs are matched case-insensitively against ``get_columns(model)``; column names
+    without wildcards are kept even when they are not listed there, e.g. for models
+    missing from the catalog.
+    """
+    selected_columns = {}
+    for column_selector in selectors:
+        model_selector, _, column_glob = column_selector.rpartition(":")
+        if model_selector:
+            matched_models = set(select_models(manifest, [model_selector]))
+            matched_models = [node for node in models if node in matched_models]
+        else:
+            matched_models = models
+        column_glob = column_glob.lower()
+        matched = False
+        for node in matched_models:
+            if not any(char in column_glob for char in "*?["):
+                columns = [column_glob]
+            else:
+                columns = fnmatch.filter([column.lower() for column in get_columns(node)], column_glob)
+            if columns:
+                selected_columns.setdefault(node, set()).update(columns)
+                matched = True
+        if not matched:
+            warnings.warn(f"Column selector {column_selector} does not match any column")
+    return selected_columns
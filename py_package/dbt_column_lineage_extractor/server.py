@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import graph, utils
+from .graph import ColumnLineageGraph
+from .store import LineageStore
+
+_DIRECTIONS = ("ancestors", "descendants")
+
+
+class _LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def put(self, key, value):
+        if not self.max_size:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class LineageQueryService:
+    """Answer recursive lineage queries against lineage loaded once, for a long-running server.
+
+    The lineage is read from a ``lineage_to_direct_parents.json`` file and indexed in a
+    ``ColumnLineageGraph``, whose reversed graph answers descendant queries; or, with
+    ``lineage_store``, queried from a ``lineage.db`` file through one read-only connection
+    shared by all threads, one query at a time. Encoded results are kept in a bounded LRU
+    cache. ``reload_if_changed()`` reloads the lineage when the file changed on disk; the
+    new lineage is built before it replaces the old one, so queries in flight are answered
+    from a consistent version.
+    """
+
+    def __init__(self, lineage_parents_file=None, lineage_store=None, cache_size=1024):
+        if (lineage_parents_file is None) == (lineage_store is None):
+            raise ValueError("Exactly one of lineage_parents_file and lineage_store is required")
+        self.file_path = lineage_store or lineage_parents_file
+        self.use_store = lineage_store is not None
+        self.cache = _LRUCache(cache_size)
+        self._reload_lock = threading.Lock()
+        self._version = None
+        # (generation, loaded lineage), replaced as a whole by reload_if_changed, so a
+        # query reading it once can't mix two versions
+        self._snapshot = (0, None)
+        self.loaded_at = None
+        self.reload_if_changed()
+
+    @property
+    def generation(self):
+        return self._snapshot[0]
+
+    def _get_file_version(self):
+        stat = os.stat(self.file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self):
+        """Reload the lineage if its file changed since it was loaded; returns whether it did."""
+        with self._reload_lock:
+            version = self._get_file_version()
+            if version == self._version:
+                return False
+            if self.use_store:
+                # the request threads share the connection; the previous one is closed once
+                # the last query holding it is done and it is garbage collected
+                loaded = (LineageStore(self.file_path, check_same_thread=False), threading.Lock())
+            else:
+                parents_graph = ColumnLineageGraph(utils.read_dict_from_file(self.file_path))
+                loaded = (parents_graph, parents_graph.reversed())
+            self._snapshot = (self._snapshot[0] + 1, loaded)
+            self._version = version
+            self.loaded_at = time.time()
+            self.cache.clear()
+            return True
+
+    def _query(self, loaded, direction, model, column, structured, max_depth):
+        if not self.use_store:
+            lineage_graph = loaded[_DIRECTIONS.index(direction)]
+            if structured:
+                return lineage_graph.find_all_related_with_structure(model, column, max_depth)
+            return lineage_graph.find_all_related(model, column, max_depth)
+
+        store, lock = loaded
+        lineage_map = (
+            store.lineage_to_direct_parents if direction == "ancestors" else store.lineage_to_direct_children
+        )
+        find_all_related = graph.find_all_related_with_structure if structured else graph.find_all_related
+        with lock:
+            return find_all_related(lineage_map, model, column, max_depth=max_depth)
+
+    def query(self, direction, model, column, structured=False, max_depth=None):
+        """Return the JSON-encoded ``{"model", "column", direction}`` result of a query."""
+        if direction not in _DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction}, expected one of {', '.join(_DIRECTIONS)}")
+        # a single read, so a concurrent reload can't mix two versions in one answer
+        generation, loaded = self._snapshot
+        # the identifiers as given, since they are echoed in the cached response
+        key = (generation, direction, model, column, structured, max_depth)
+        result = self.cache.get(key)
+        if result is None:
+            related = self._query(loaded, direction, model, column, structured, max_depth)
+            result = utils.dumps({"model": model, "column": column, direction: related})
+            self.cache.put(key, result)
+        return result
+
+    def get_status(self):
+        generation, loaded = self._snapshot
+        status = {
+            "file_path": self.file_path,
+            "loaded_at": self.loaded_at,
+            "generation": generation,
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+        if not self.use_store:
+            parents_graph = loaded[0]
+            status.update(columns=len(parents_graph), edges=parents_graph.edge_count)
+        return status
+
+
+class _LineageRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, utils.dumps({"error": message}))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        direction = url.path.strip("/")
+        if direction in ("", "status"):
+            self._send(200, utils.dumps(self.service.get_status()))
+            return
+        if direction not in _DIRECTIONS:
+            self._send_error(404, f"Unknown path {url.path}, expected /ancestors, /descendants or /status")
+            return
+        if "model" not in params or "column" not in params:
+            self._send_error(400, "The model and column query parameters are required")
+            return
+        try:
+            max_depth = int(params["max_depth"]) if params.get("max_depth") else None
+        except ValueError:
+            self._send_error(400, "max_depth must be an integer")
+            return
+        structured = params.get("structured", "").lower() in ("1", "true", "yes")
+        self._send(
+            200,
+            self.service.query(direction, params["model"], params["column"], structured, max_depth),
+        )
+
+
+def serve(service, host="127.0.0.1", port=8080, reload_interval=5):
+    """Serve ``service`` over HTTP until interrupted, one thread per request.
+
+    ``GET /ancestors`` and ``GET /descendants`` take ``model`` and ``column`` query
+    parameters, and optionally ``structured=true`` and ``max_depth``; ``GET /status``
+    describes the loaded lineage and the cache. Every ``reload_interval`` seconds the
+    lineage file is checked and reloaded if it changed; ``0`` disables reloading.
+    """
+    handler = type("LineageRequestHandler", (_LineageRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    stopped = threading.Event()
+
+    def watch():
+        while not stopped.wait(reload_interval):
+            try:
+                if service.reload_if_changed():
+                    print(f"Reloaded lineage from {service.file_path}")
+            except (OSError, ValueError) as e:
+                # e.g. the file is being rewritten; keep serving the loaded lineage
+                print(f"Failed to reload lineage from {service.file_path}: {e}")
+
+    if reload_interval:
+        threading.Thread(target=watch, daemon=True).start()
+    print(f"Serving lineage from {service.file_path} on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
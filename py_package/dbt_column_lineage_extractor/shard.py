@@ -0,0 +1,125 @@
+import csv
+import glob
+import heapq
+import os
+import re
+
+from . import graph, utils
+
+_SHARD_PATTERN = re.compile(r"^(\d+)/(\d+)$")
+_SHARD_FILE_PATTERN = re.compile(r"shard_(\d+)_of_(\d+)")
+
+
+def parse_shard(value):
+    """Parse a ``i/N`` shard spec into ``(i, N)``, with shards numbered from 1."""
+    match = _SHARD_PATTERN.match(value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard {value}, expected i/N with 1 <= i <= N")
+    return int(match.group(1)), int(match.group(2))
+
+
+def get_shard_file_name(shard_index, shard_count):
+    return f"lineage_to_direct_parents.shard_{shard_index}_of_{shard_count}.json"
+
+
+def read_costs(file_path):
+    """Read per-model ``seconds`` from a metrics file written by ``LineageMetrics.write``."""
+    if file_path.endswith(".csv"):
+        with open(file_path, "r", newline="") as file:
+            rows = list(csv.DictReader(file))
+    else:
+        rows = utils.read_json(file_path)["models"]
+    # cached models and models sharing a SQL template took no time in that run, so they
+    # say nothing about their cost
+    return {
+        row["model_node"]: float(row["seconds"])
+        for row in rows
+        if str(row["cached"]).lower() not in ("true", "1")
+        and str(row.get("template_hit", False)).lower() not in ("true", "1")
+    }
+
+
+def get_model_costs(manifest, models, costs=None):
+    """Estimate the extraction cost of every model: its historical seconds when known, its
+    compiled SQL size otherwise, scaled to seconds by the models that have both."""
+    sql_sizes = {
+        model_node: len(manifest["nodes"].get(model_node, {}).get("compiled_code") or "")
+        for model_node in models
+    }
+    if not costs:
+        return sql_sizes
+    known = [model_node for model_node in models if model_node in costs]
+    known_size = sum(sql_sizes[model_node] for model_node in known)
+    seconds_per_char = sum(costs[model_node] for model_node in known) / known_size if known_size else 0
+    return {
+        model_node: costs[model_node] if model_node in costs else sql_sizes[model_node] * seconds_per_char
+        for model_node in models
+    }
+
+
+def get_shard_models(manifest, models, shard_index, shard_count, costs=None):
+    """Return the models of shard ``shard_index`` (from 1) out of ``shard_count``, in the
+    order of ``models``.
+
+    Models are assigned greedily, most expensive first, to the shard with the lowest total
+    cost so far, see ``get_model_costs``. Ties are broken by model id and shard number, so
+    every shard computes the same partition independently.
+    """
+    model_costs = get_model_costs(manifest, models, costs)
+    shards = [(0, index) for index in range(1, shard_count + 1)]
+    assigned = set()
+    for model_node in sorted(models, key=lambda x: (-model_costs[x], x)):
+        total, index = heapq.heappop(shards)
+        if index == shard_index:
+            assigned.add(model_node)
+        heapq.heappush(shards, (total + model_costs[model_node], index))
+    return [model_node for model_node in models if model_node in assigned]
+
+
+def merge_shards(shard_lineages, model_order=None):
+    """Merge partial ``lineage_to_direct_parents`` maps into the full parents and children maps.
+
+    ``shard_lineages`` are the partial maps in shard order. Models are ordered by their
+    position in ``model_order`` (e.g. the manifest nodes, matching an unsharded run), and
+    models missing from it come last, in shard order. Raises ``ValueError`` if a model
+    is in several shards.
+    """
+    merged = {}
+    for shard_lineage in shard_lineages:
+        for model_node, columns in shard_lineage.items():
+            if model_node in merged:
+                raise ValueError(f"Model {model_node} is in several shards")
+            merged[model_node] = columns
+
+    if model_order is not None:
+        positions = {model_node.lower(): position for position, model_node in enumerate(model_order)}
+        ordered = sorted(merged, key=lambda x: positions.get(x, len(positions)))
+        merged = {model_node: merged[model_node] for model_node in ordered}
+
+    return merged, graph.get_lineage_to_direct_children(merged)
+
+
+def find_shard_files(input_dir):
+    """Return the shard files in ``input_dir``, ordered by shard number."""
+    file_paths = glob.glob(os.path.join(input_dir, get_shard_file_name("*", "*")))
+    return sorted(
+        file_paths,
+        key=lambda file_path: [int(x) for x in _SHARD_FILE_PATTERN.search(file_path).groups()][::-1],
+    )
+
+
+def check_shard_files(file_paths):
+    """Raise ``ValueError`` unless the files named like ``get_shard_file_name`` form one
+    complete set of shards."""
+    shards = [_SHARD_FILE_PATTERN.search(file_path) for file_path in file_paths]
+    if not any(shards):
+        return
+    counts = {int(match.group(2)) for match in shards if match}
+    if len(counts) != 1 or not all(shards):
+        raise ValueError("The shard files come from runs with different shard counts")
+    shard_count = counts.pop()
+    missing = set(range(1, shard_count + 1)) - {int(match.group(1)) for match in shards}
+    if missing or len(shards) != shard_count:
+        raise ValueError(
+            f"Expected shards 1 to {shard_count} once each, missing {sorted(missing) or 'none'}"
+        )
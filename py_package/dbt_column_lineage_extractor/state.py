@@ -0,0 +1,120 @@
+from . import graph
+
+
+def _get_catalog_columns(catalog, node):
+    for key in ("nodes", "sources"):
+        if node in catalog.get(key, {}):
+            columns = catalog[key][node]["columns"]
+            return {col_name: col_info["type"] for col_name, col_info in columns.items()}
+    return None
+
+
+def _get_manifest_node(manifest, node):
+    if node in manifest.get("nodes", {}):
+        return manifest["nodes"][node]
+    return manifest.get("sources", {}).get(node)
+
+
+def _get_relation(node_info):
+    if node_info is None:
+        return None
+    return f"{node_info['database']}.{node_info['schema']}.{node_info['name']}".lower()
+
+
+def _is_node_state_modified(node, previous_manifest, previous_catalog, manifest, catalog):
+    previous_info = _get_manifest_node(previous_manifest, node)
+    current_info = _get_manifest_node(manifest, node)
+    return (
+        _get_relation(previous_info) != _get_relation(current_info)
+        or _get_catalog_columns(previous_catalog, node) != _get_catalog_columns(catalog, node)
+    )
+
+
+def get_modified_models(previous_manifest, previous_catalog, manifest, catalog, selected_models):
+    """Compare two sets of dbt artifacts, similar to dbt's ``state:modified`` selector.
+
+    A selected model is modified if it is new, or if its ``compiled_code``, ``depends_on``
+    nodes, relation name or catalog columns changed, or if the relation name or catalog
+    columns of any of its parents changed (its schema slice is then different).
+
+    Returns a tuple ``(modified, removed)``: the modified models in manifest order, and the
+    models that were in the previous manifest but no longer exist.
+    """
+    previous_nodes = previous_manifest.get("nodes", {})
+    current_nodes = manifest.get("nodes", {})
+    node_state_modified = {}
+
+    def is_node_state_modified(node):
+        if node not in node_state_modified:
+            node_state_modified[node] = _is_node_state_modified(
+                node, previous_manifest, previous_catalog, manifest, catalog
+            )
+        return node_state_modified[node]
+
+    selected = set(selected_models)
+    modified = []
+    for node, info in current_nodes.items():
+        if node not in selected:
+            continue
+        previous_info = previous_nodes.get(node)
+        if (
+            previous_info is None
+            or previous_info.get("compiled_code") != info.get("compiled_code")
+            or previous_info["depends_on"]["nodes"] != info["depends_on"]["nodes"]
+            or is_node_state_modified(node)
+            or any(is_node_state_modified(parent) for parent in info["depends_on"]["nodes"])
+        ):
+            modified.append(node)
+
+    removed = [
+        node
+        for node, info in previous_nodes.items()
+        if info["resource_type"] == "model" and node not in current_nodes
+    ]
+    return modified, removed
+
+
+def remove_model_from_lineage(model_node, lineage_to_direct_parents, lineage_to_direct_children):
+    """Drop a model's parent edges, and the matching child edges, from both lineage maps in place."""
+    model_node = model_node.lower()
+    for column, parents in lineage_to_direct_parents.pop(model_node, {}).items():
+        child = {"column": column, "dbt_node": model_node}
+        for parent in parents:
+            parent_model, parent_column = parent["dbt_node"], parent["column"]
+            children = lineage_to_direct_children.get(parent_model, {}).get(parent_column)
+            if not children:
+                continue
+            children[:] = [x for x in children if x != child]
+            if not children:
+                del lineage_to_direct_children[parent_model][parent_column]
+                if not lineage_to_direct_children[parent_model]:
+                    del lineage_to_direct_children[parent_model]
+
+
+def add_model_to_lineage(model_node, columns, lineage_to_direct_parents, lineage_to_direct_children):
+    """Add a model's parent edges, and the matching child edges, to both lineage maps in place."""
+    model_node = model_node.lower()
+    lineage_to_direct_parents[model_node] = columns
+    for column, parents in columns.items():
+        for parent in parents:
+            parent_model, parent_column = parent["dbt_node"].lower(), parent["column"].lower()
+            lineage_to_direct_children.setdefault(parent_model, {}).setdefault(
+                parent_column, []
+            ).append({"column": column, "dbt_node": model_node})
+
+
+def sort_lineage(manifest, lineage_to_direct_parents, lineage_to_direct_children):
+    """Reorder both lineage maps in place as a full run writes them.
+
+    Re-extracted models are added at the end of the parents map; it is reordered by
+    manifest order, with models missing from the manifest last, and the children map is
+    rebuilt from it, so its nodes, columns and edges come in the order of a full run too.
+    """
+    positions = {node.lower(): position for position, node in enumerate(manifest.get("nodes", {}))}
+    ordered = sorted(
+        lineage_to_direct_parents.items(), key=lambda item: positions.get(item[0], len(positions))
+    )
+    lineage_to_direct_parents.clear()
+    lineage_to_direct_parents.update(ordered)
+    lineage_to_direct_children.clear()
+    graph.get_lineage_to_direct_children(lineage_to_direct_parents, lineage_to_direct_children)
@@ -0,0 +1,362 @@
+import os
+import sqlite3
+from collections.abc import Mapping
+
+_SCHEMA = """
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    -- position of the node among the keys of lineage_to_direct_parents, NULL if not a key
+    parents_position INTEGER
+);
+CREATE TABLE columns (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE pairs (
+    id INTEGER PRIMARY KEY,
+    node_id INTEGER NOT NULL,
+    column_id INTEGER NOT NULL,
+    parents_position INTEGER,
+    UNIQUE (node_id, column_id)
+);
+-- one row per child -> parent edge, in the order of lineage_to_direct_parents
+CREATE TABLE edges (
+    position INTEGER PRIMARY KEY,
+    child_pair INTEGER NOT NULL,
+    parent_pair INTEGER NOT NULL
+);
+CREATE INDEX edges_child ON edges (child_pair, position);
+CREATE INDEX edges_parent ON edges (parent_pair, position);
+"""
+
+
+class LineageStoreWriter:
+    """Append models to a new lineage file one at a time, see ``write_lineage_store``.
+
+    The file is written under a temporary name and moved into place by ``close()``.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._tmp_path = f"{file_path}.tmp"
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._nodes = {}
+        self._columns = {}
+        self._pairs = {}
+        self._node_position = 0
+        self.connection = sqlite3.connect(self._tmp_path)
+        self.connection.executescript(_SCHEMA)
+
+    def _get_node_id(self, name):
+        if name not in self._nodes:
+            self._nodes[name] = len(self._nodes)
+            self.connection.execute(
+                "INSERT INTO nodes VALUES (?, ?, NULL)", (self._nodes[name], name)
+            )
+        return self._nodes[name]
+
+    def _get_pair_id(self, node, column):
+        node_id = self._get_node_id(node)
+        if column not in self._columns:
+            self._columns[column] = len(self._columns)
+            self.connection.execute(
+                "INSERT INTO columns VALUES (?, ?)", (self._columns[column], column)
+            )
+        key = (node_id, self._columns[column])
+        if key not in self._pairs:
+            self._pairs[key] = len(self._pairs)
+            self.connection.execute(
+                "INSERT INTO pairs VALUES (?, ?, ?, NULL)", (self._pairs[key],) + key
+            )
+        return self._pairs[key]
+
+    def add_model(self, model_node, columns):
+        node_id = self._get_node_id(model_node)
+        self.connection.execute(
+            "UPDATE nodes SET parents_position = ? WHERE id = ?", (self._node_position, node_id)
+        )
+        self._node_position += 1
+        edge_rows = []
+        for column_position, (column, parents) in enumerate(columns.items()):
+            child_pair = self._get_pair_id(model_node, column)
+            self.connection.execute(
+                "UPDATE pairs SET parents_position = ? WHERE id = ?", (column_position, child_pair)
+            )
+            for parent in parents:
+                edge_rows.append((child_pair, self._get_pair_id(parent["dbt_node"], parent["column"])))
+        self.connection.executemany(
+            "INSERT INTO edges (child_pair, parent_pair) VALUES (?, ?)", edge_rows
+        )
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+        os.replace(self._tmp_path, self.file_path)
+
+
+def write_lineage_store(lineage_to_direct_parents, file_path):
+    """Write a lineage map to a single indexed SQLite file.
+
+    Node ids and column names are stored once in string tables, and every edge is a row
+    of integer pair ids indexed in both directions, so ``LineageStore`` can answer parent
+    and child lookups without loading the graph. The children map is implied by the
+    edges and isn't stored separately. ``lineage_to_direct_parents`` can also be an
+    iterable of ``(model_node, columns)`` items, such as
+    ``DbtColumnLineageExtractor.iter_lineage_to_direct_parents()``.
+    """
+    if isinstance(lineage_to_direct_parents, Mapping):
+        lineage_to_direct_parents = lineage_to_direct_parents.items()
+    writer = LineageStoreWriter(file_path)
+    for model_node, columns in lineage_to_direct_parents:
+        writer.add_model(model_node, columns)
+    writer.close()
+
+
+class LineageStore:
+    """Read-only access to a lineage file written by ``write_lineage_store``.
+
+    ``lineage_to_direct_parents`` and ``lineage_to_direct_children`` behave like the JSON
+    lineage dicts and can be passed to ``DbtColumnLineageExtractor.find_all_related``
+    and ``find_all_related_with_structure``; every lookup is an indexed query, so only
+    the part of the graph a query reaches is read.
+    """
+
+    def __init__(self, file_path, check_same_thread=True):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        # with check_same_thread=False, callers sharing the store between threads must
+        # serialize its queries
+        self.connection = sqlite3.connect(
+            f"file:{file_path}?mode=ro", uri=True, check_same_thread=check_same_thread
+        )
+        self.lineage_to_direct_parents = _StoreLineageToDirectParents(self)
+        self.lineage_to_direct_children = _StoreLineageToDirectChildren(self)
+
+    def close(self):
+        self.connection.close()
+
+    def _query(self, sql, params=()):
+        return self.connection.execute(sql, params).fetchall()
+
+    def _get_pair_id(self, model_node, column):
+        rows = self._query(
+            """
+            SELECT pairs.id, pairs.parents_position FROM pairs
+            JOIN nodes ON nodes.id = pairs.node_id
+            JOIN columns ON columns.id = pairs.column_id
+            WHERE nodes.name = ? AND columns.name = ?
+            """,
+            (model_node, column),
+        )
+        return rows[0] if rows else (None, None)
+
+    def _get_related(self, pair_id, from_column, to_column):
+        return [
+            {"column": column, "dbt_node": node}
+            for node, column in self._query(
+                f"""
+                SELECT nodes.name, columns.name FROM edges
+                JOIN pairs ON pairs.id = edges.{to_column}
+                JOIN nodes ON nodes.id = pairs.node_id
+                JOIN columns ON columns.id = pairs.column_id
+                WHERE edges.{from_column} = ?
+                ORDER BY edges.position
+                """,
+                (pair_id,),
+            )
+        ]
+
+    def get_direct_parents(self, model_node, column):
+        pair_id, _ = self._get_pair_id(model_node, column)
+        if pair_id is None:
+            return []
+        return self._get_related(pair_id, "child_pair", "parent_pair")
+
+    def get_direct_children(self, model_node, column):
+        pair_id, _ = self._get_pair_id(model_node, column)
+        if pair_id is None:
+            return []
+        return self._get_related(pair_id, "parent_pair", "child_pair")
+
+    def to_lineage_to_direct_parents(self):
+        """Rebuild the ``lineage_to_direct_parents`` dict, as written to JSON."""
+        lineage = {
+            name: {}
+            for (name,) in self._query(
+                "SELECT name FROM nodes WHERE parents_position IS NOT NULL ORDER BY parents_position"
+            )
+        }
+        pair_lists = {}
+        for pair_id, node, column in self._query(
+            """
+            SELECT pairs.id, nodes.name, columns.name FROM pairs
+            JOIN nodes ON nodes.id = pairs.node_id
+            JOIN columns ON columns.id = pairs.column_id
+            WHERE pairs.parents_position IS NOT NULL
+            ORDER BY nodes.parents_position, pairs.parents_position
+            """
+        ):
+            pair_lists[pair_id] = lineage[node][column] = []
+        for child_pair, parent_node, parent_column in self._query(
+            """
+            SELECT edges.child_pair, nodes.name, columns.name FROM edges
+            JOIN pairs ON pairs.id = edges.parent_pair
+            JOIN nodes ON nodes.id = pairs.node_id
+            JOIN columns ON columns.id = pairs.column_id
+            ORDER BY edges.position
+            """
+        ):
+            pair_lists[child_pair].append({"column": parent_column, "dbt_node": parent_node})
+        return lineage
+
+    def to_lineage_to_direct_children(self):
+        """Rebuild the ``lineage_to_direct_children`` dict, as written to JSON."""
+        lineage = {}
+        for parent_node, parent_column, child_node, child_column in self._query(
+            """
+            SELECT parent_nodes.name, parent_columns.name, child_nodes.name, child_columns.name
+            FROM edges
+            JOIN pairs AS parent_pairs ON parent_pairs.id = edges.parent_pair
+            JOIN nodes AS parent_nodes ON parent_nodes.id = parent_pairs.node_id
+            JOIN columns AS parent_columns ON parent_columns.id = parent_pairs.column_id
+            JOIN pairs AS child_pairs ON child_pairs.id = edges.child_pair
+            JOIN nodes AS child_nodes ON child_nodes.id = child_pairs.node_id
+            JOIN columns AS child_columns ON child_columns.id = child_pairs.column_id
+            ORDER BY edges.position
+            """
+        ):
+            lineage.setdefault(parent_node, {}).setdefault(parent_column, []).append(
+                {"column": child_column, "dbt_node": child_node}
+            )
+        return lineage
+
+
+class _StoreLineageToDirectParents(Mapping):
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, model_node):
+        rows = self._store._query(
+            "SELECT 1 FROM nodes WHERE name = ? AND parents_position IS NOT NULL", (model_node,)
+        )
+        if not rows:
+            raise KeyError(model_node)
+        return _StoreNodeParents(self._store, model_node)
+
+    def __iter__(self):
+        return iter(
+            name
+            for (name,) in self._store._query(
+                "SELECT name FROM nodes WHERE parents_position IS NOT NULL ORDER BY parents_position"
+            )
+        )
+
+    def __len__(self):
+        return self._store._query("SELECT COUNT(*) FROM nodes WHERE parents_position IS NOT NULL")[0][0]
+
+
+class _StoreNodeParents(Mapping):
+    def __init__(self, store, model_node):
+        self._store = store
+        self._model_node = model_node
+
+    def _get_columns(self):
+        return [
+            name
+            for (name,) in self._store._query(
+                """
+                SELECT columns.name FROM pairs
+                JOIN nodes ON nodes.id = pairs.node_id
+                JOIN columns ON columns.id = pairs.column_id
+                WHERE nodes.name = ? AND pairs.parents_position IS NOT NULL
+                ORDER BY pairs.parents_position
+                """,
+                (self._model_node,),
+            )
+        ]
+
+    def __getitem__(self, column):
+        pair_id, parents_position = self._store._get_pair_id(self._model_node, column)
+        if parents_position is None:
+            raise KeyError(column)
+        return self._store._get_related(pair_id, "child_pair", "parent_pair")
+
+    def __iter__(self):
+        return iter(self._get_columns())
+
+    def __len__(self):
+        return len(self._get_columns())
+
+
+class _StoreLineageToDirectChildren(Mapping):
+    def __init__(self, store):
+        self._store = store
+
+    def _get_nodes(self):
+        return [
+            name
+            for (name,) in self._store._query(
+                """
+                SELECT nodes.name FROM edges
+                JOIN pairs ON pairs.id = edges.parent_pair
+                JOIN nodes ON nodes.id = pairs.node_id
+                GROUP BY nodes.id ORDER BY MIN(edges.position)
+                """
+            )
+        ]
+
+    def __getitem__(self, node):
+        rows = self._store._query(
+            """
+            SELECT 1 FROM edges
+            JOIN pairs ON pairs.id = edges.parent_pair
+            JOIN nodes ON nodes.id = pairs.node_id
+            WHERE nodes.name = ? LIMIT 1
+            """,
+            (node,),
+        )
+        if not rows:
+            raise KeyError(node)
+        return _StoreNodeChildren(self._store, node)
+
+    def __iter__(self):
+        return iter(self._get_nodes())
+
+    def __len__(self):
+        return len(self._get_nodes())
+
+
+class _StoreNodeChildren(Mapping):
+    def __init__(self, store, node):
+        self._store = store
+        self._node = node
+
+    def _get_columns(self):
+        return [
+            name
+            for (name,) in self._store._query(
+                """
+                SELECT columns.name FROM edges
+                JOIN pairs ON pairs.id = edges.parent_pair
+                JOIN nodes ON nodes.id = pairs.node_id
+                JOIN columns ON columns.id = pairs.column_id
+                WHERE nodes.name = ?
+                GROUP BY pairs.id ORDER BY MIN(edges.position)
+                """,
+                (self._node,),
+            )
+        ]
+
+    def __getitem__(self, column):
+        children = self._store.get_direct_children(self._node, column)
+        if not children:
+            raise KeyError(column)
+        return children
+
+    def __iter__(self):
+        return iter(self._get_columns())
+
+    def __len__(self):
+        return len(self._get_columns())
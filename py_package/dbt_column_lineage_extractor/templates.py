@@ -0,0 +1,103 @@
+import hashlib
+import json
+import re
+
+
+def _get_table_name(relation_name):
+    # the database.schema.table name of a relation, as sqlglot table leaves spell it
+    parts = [part.strip('"`[]') for part in relation_name.split(".")]
+    if len(parts) != 3 or not all(parts):
+        return None
+    return ".".join(parts).lower()
+
+
+class LineageTemplates:
+    """Share lineage results between models whose compiled SQL only differs by the relations
+    it reads from, e.g. per-region or per-tenant copies of a model generated by a macro.
+
+    The relation names of a model's parents are replaced in its compiled SQL by numbered
+    placeholders, in order of appearance. Models with the same template, the same parent
+    columns and types behind every placeholder, and the same columns get the same lineage
+    up to the parent tables, so the table leaves of the first one are reused for the
+    others, with each placeholder's table renamed to the model's own parent. Only parents
+    referenced by fully qualified ``database.schema.table`` names are templated; other
+    models are extracted as usual.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, model_sql, relations, columns, dialect):
+        """Return ``(key, table_names)`` for a model, given the ``(relation_name, column_types)``
+        of its parents; ``key`` is ``None`` when the model can't be templated."""
+        table_names = {}
+        column_types = {}
+        for relation_name, parent_column_types in relations:
+            table_name = _get_table_name(relation_name)
+            if table_name is None:
+                return None, None
+            table_names[relation_name.lower()] = table_name
+            column_types[relation_name.lower()] = parent_column_types
+        if not table_names:
+            return None, None
+
+        # longest names first, so a relation isn't replaced inside a longer one
+        pattern = re.compile(
+            r"(?<![\w$.])("
+            + "|".join(re.escape(relation) for relation in sorted(table_names, key=len, reverse=True))
+            + r")(?![\w$])",
+            re.IGNORECASE,
+        )
+        placeholders = {}
+
+        def replace(match):
+            relation = match.group(0).lower()
+            if relation not in placeholders:
+                placeholders[relation] = len(placeholders)
+            return f"__relation_{placeholders[relation]}__"
+
+        template_sql = pattern.sub(replace, model_sql)
+        placeholder_tables = [table_names[relation] for relation in placeholders]
+        if len(set(placeholder_tables)) != len(placeholder_tables):
+            return None, None
+        key_parts = [
+            str(dialect),
+            template_sql,
+            [column_types[relation] for relation in placeholders],
+            columns,
+        ]
+        return hashlib.sha256(json.dumps(key_parts).encode("utf-8")).hexdigest(), placeholder_tables
+
+    def get(self, key, table_names):
+        """Return the table leaves stored for ``key``, with the template's tables renamed to
+        ``table_names``, or ``None``."""
+        if key not in self._results:
+            self.misses += 1
+            return None
+        self.hits += 1
+        template_tables, column_leaves = self._results[key]
+        renamed_tables = dict(zip(template_tables, table_names))
+        return {
+            column: [
+                (column_name, renamed_tables.get(table_name, table_name))
+                for column_name, table_name in table_leaves
+            ]
+            for column, table_leaves in column_leaves.items()
+        }
+
+    def put(self, key, table_names, column_leaves):
+        if key is not None and key not in self._results:
+            self._results[key] = (table_names, column_leaves)
+
+    def __len__(self):
+        return len(self._results)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0
+        return (
+            f"SQL templates: {self.hits} hits, {self.misses} misses ({hit_rate:.0%} hit rate), "
+            f"{len(self)} distinct templates extracted"
+        )
@@ -0,0 +1,116 @@
+import json
+import os
+import signal
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+
+
+class LineageTimeoutError(BaseException):
+    # a BaseException, like KeyboardInterrupt, so it isn't wrapped or swallowed by the
+    # `except Exception` blocks in sqlglot's tokenizer
+    pass
+
+
+def _can_interrupt():
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def time_limit(seconds):
+    """Raise ``LineageTimeoutError`` in the block once ``seconds`` have elapsed.
+
+    The limit is enforced with a ``SIGALRM`` timer, so it interrupts pure Python work such
+    as sqlglot's parser and optimizer. Timers don't nest; it is a no-op when ``seconds``
+    is falsy, and outside the main thread or on platforms without ``setitimer``.
+    """
+    if not seconds:
+        yield
+        return
+    if not _can_interrupt():
+        warnings.warn("Lineage timeouts are only enforced in the main thread on POSIX platforms")
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise LineageTimeoutError(f"Timed out after {seconds:.1f}s")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+class LineageTimeouts:
+    """Time budgets for lineage extraction, and a quarantine of models that exceeded them.
+
+    ``column_timeout`` bounds a single column's lineage, ``model_timeout`` a whole model,
+    including parsing and qualification. A column that runs out of time is left out of the
+    model's lineage; a model that runs out of time gets no columns at all. Either way the
+    model is quarantined, and with ``quarantine_file`` the quarantine is kept across runs:
+    quarantined models are extracted after all other models, or not at all with
+    ``skip_quarantined``. A quarantined model that completes within its budgets is released.
+    """
+
+    def __init__(self, column_timeout=None, model_timeout=None, quarantine_file=None, skip_quarantined=False):
+        self.column_timeout = column_timeout
+        self.model_timeout = model_timeout
+        self.quarantine_file = quarantine_file
+        self.skip_quarantined = skip_quarantined
+        self.quarantine = {}
+        if quarantine_file and os.path.exists(quarantine_file):
+            with open(quarantine_file, "r") as file:
+                self.quarantine = json.load(file)
+        self.timed_out_models = []
+        self.released_models = []
+
+    def is_quarantined(self, model_node):
+        return model_node in self.quarantine
+
+    def order_models(self, models):
+        """Return ``models`` with quarantined models moved to the end, keeping the order
+        otherwise."""
+        return [x for x in models if x not in self.quarantine] + [
+            x for x in models if x in self.quarantine
+        ]
+
+    def record(self, model_node, result):
+        """Record the timeout result of one extracted model, see ``_extract_table_leaves_for_model``."""
+        if result is None:
+            if model_node in self.quarantine:
+                del self.quarantine[model_node]
+                self.released_models.append(model_node)
+            return
+        result = dict(result, timestamp=time.time())
+        self.quarantine[model_node] = result
+        self.timed_out_models.append(model_node)
+
+    def save(self):
+        if not self.quarantine_file:
+            return
+        tmp_path = f"{self.quarantine_file}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.quarantine, file, indent=4)
+        os.replace(tmp_path, self.quarantine_file)
+
+    def summary(self):
+        lines = []
+        for model_node in self.timed_out_models:
+            entry = self.quarantine[model_node]
+            if entry["model_timed_out"]:
+                lines.append(f"  {model_node}: model timed out after {entry['seconds']:.1f}s")
+            else:
+                lines.append(
+                    f"  {model_node}: {len(entry['timed_out_columns'])} columns timed out "
+                    f"({', '.join(entry['timed_out_columns'])})"
+                )
+        header = (
+            f"Lineage timeouts: {len(self.timed_out_models)} models timed out, "
+            f"{len(self.released_models)} released from quarantine, "
+            f"{len(self.quarantine)} models in quarantine"
+        )
+        return "\n".join([header] + lines)
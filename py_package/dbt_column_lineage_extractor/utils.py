@@ -1,12 +1,54 @@
 import json
 import os
 
+# optional faster JSON backends, used when installed; the files written are the same
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 def clear_screen():
     os.system("cls" if os.name == "nt" else "clear")
 
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+def _widen_indent(encoded, indent):
+    # orjson only indents by 2 spaces. JSON strings can't contain raw newlines, so leading
+    # spaces are always indentation: widen them level by level, deepest first, so that a
+    # line at depth d gains d * (indent - 2) spaces, with one bytes.replace per level
+    depth = 0
+    while b"\n" + b"  " * (depth + 1) in encoded:
+        depth += 1
+    for level in range(depth, 0, -1):
+        prefix = b"\n" + b"  " * level
+        encoded = encoded.replace(prefix, prefix + b" " * (indent - 2))
+    return encoded
+
+def dumps(value, indent=None):
+    """Encode ``value`` as JSON bytes, formatted like ``json.dumps``, except that the fast
+    backends write non-ASCII characters as UTF-8 instead of escaping them."""
+    if orjson is not None:
+        if indent is None:
+            return orjson.dumps(value)
+        return _widen_indent(orjson.dumps(value, option=orjson.OPT_INDENT_2), indent)
+    if msgspec is not None:
+        encoded = msgspec.json.encode(value)
+        return encoded if indent is None else msgspec.json.format(encoded, indent=indent)
+    return json.dumps(value, indent=indent).encode("utf-8")
+
 def read_json(file_path):
-    with open(file_path, "r") as file:
-        return json.load(file)
+    with open(file_path, "rb") as file:
+        return loads(file.read())
 
 
 def pretty_print_dict(dict_to_print):
@@ -14,9 +56,22 @@ def pretty_print_dict(dict_to_print):
 
 
 def write_dict_to_file(dict_to_write, file_path):
-    with open(file_path, "w") as file:
-        json.dump(dict_to_write, file, indent=4)
+    with open(file_path, "wb") as file:
+        file.write(dumps(dict_to_write, indent=4))
+
+def write_items_to_file(items, file_path):
+    """Write ``(key, value)`` pairs as a JSON object, byte for byte like
+    ``write_dict_to_file(dict(items))``, encoding one value at a time."""
+    with open(file_path, "wb") as file:
+        separator = b"{\n"
+        for key, value in items:
+            # strip the braces of a single-key object, keeping its indented member
+            file.write(separator + dumps({key: value}, indent=4)[2:-2])
+            separator = b",\n"
+        file.write(b"{}" if separator == b"{\n" else b"\n}")
+
+def write_ndjson_line(dict_to_write, file):
+    file.write(dumps(dict_to_write).decode("utf-8") + "\n")
 
 def read_dict_from_file(file_path):
-    with open(file_path, "r") as file:
-        return json.load(file)
+    return read_json(file_path)
@@ -13,6 +13,10 @@ setup(
     install_requires=[
         'sqlglot[rs] == 25.24.5',
     ],
+    extras_require={
+        'streaming': ['ijson'],
+        'fast-json': ['orjson'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -23,6 +27,8 @@ setup(
         'console_scripts': [
             'dbt_column_lineage_direct=dbt_column_lineage_extractor.cli_direct:main',
             'dbt_column_lineage_recursive=dbt_column_lineage_extractor.cli_recursive:main',
+            'dbt_column_lineage_serve=dbt_column_lineage_extractor.cli_serve:main',
+            'dbt_column_lineage_merge=dbt_column_lineage_extractor.cli_merge:main',
         ],
     },
 )
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples")
+MANIFEST_PATH = os.path.join(EXAMPLES_DIR, "inputs", "manifest.json")
+CATALOG_PATH = os.path.join(EXAMPLES_DIR, "inputs", "catalog.json")
+EXAMPLE_PARENTS_PATH = os.path.join(EXAMPLES_DIR, "outputs", "example__lineage_to_direct_parents.json")
+EXAMPLE_CHILDREN_PATH = os.path.join(EXAMPLES_DIR, "outputs", "example__lineage_to_direct_children.json")
+
+
+@pytest.fixture(scope="session")
+def extractor():
+    from dbt_column_lineage_extractor import DbtColumnLineageExtractor
+
+    return DbtColumnLineageExtractor(manifest_path=MANIFEST_PATH, catalog_path=CATALOG_PATH)
+
+
+@pytest.fixture(scope="session")
+def example_parents():
+    from dbt_column_lineage_extractor import utils
+
+    return utils.read_dict_from_file(EXAMPLE_PARENTS_PATH)
+
+
+@pytest.fixture(scope="session")
+def example_children():
+    from dbt_column_lineage_extractor import utils
+
+    return utils.read_dict_from_file(EXAMPLE_CHILDREN_PATH)
+
+
+@pytest.fixture
+def run_cli(monkeypatch):
+    """Run a CLI ``main`` with the given arguments, as if called from the command line."""
+
+    def run(main, *args):
+        monkeypatch.setattr("sys.argv", ["cli", *args])
+        main()
+
+    return run
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from dbt_column_lineage_extractor import cache as cache_module
+from dbt_column_lineage_extractor import cli_direct
+from dbt_column_lineage_extractor.cache import LineageCache
+
+from conftest import CATALOG_PATH, EXAMPLE_CHILDREN_PATH, EXAMPLE_PARENTS_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+KEY_ARGS = {
+    "model_node": "model.p.orders",
+    "dialect": "snowflake",
+    "model_sql": "select id from db.s.raw_orders",
+    "schema": {"db": {"s": {"raw_orders": {"id": "NUMBER"}}}},
+    "columns": ["id"],
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LineageCache(str(tmp_path / "cache"))
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("model_node", "model.p.other"),
+        ("dialect", "bigquery"),
+        ("model_sql", "select id from db.s.raw_orders_v2"),
+        ("schema", {"db": {"s": {"raw_orders": {"id": "TEXT"}}}}),
+        ("columns", ["id", "status"]),
+    ],
+)
+def test_key_changes_with_every_component(cache, name, value):
+    key = cache.make_key(**KEY_ARGS)
+    cache.put(key, {"id": [["id", "db.s.raw_orders"]]})
+    assert cache.make_key(**KEY_ARGS) == key
+    assert cache.get(cache.make_key(**dict(KEY_ARGS, **{name: value}))) is None
+    assert cache.get(key) == {"id": [["id", "db.s.raw_orders"]]}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_changes_with_sqlglot_version(cache, monkeypatch):
+    key = cache.make_key(**KEY_ARGS)
+    monkeypatch.setattr(cache_module.sqlglot, "__version__", "0.0.0")
+    assert cache.make_key(**KEY_ARGS) != key
+
+
+def _age(path, seconds):
+    timestamp = time.time() - seconds
+    os.utime(path, (timestamp, timestamp))
+
+
+def test_evict_by_age(tmp_path):
+    cache = LineageCache(str(tmp_path), max_size_mb=None, max_age_days=1)
+    for key in ("old", "new"):
+        cache.put(key, {})
+    _age(cache._path("old"), 2 * 24 * 60 * 60)
+    assert cache.evict() == 1
+    assert sorted(os.listdir(tmp_path)) == ["new.json"]
+
+
+def test_evict_by_size(tmp_path):
+    cache = LineageCache(str(tmp_path), max_size_mb=1, max_age_days=None)
+    value = {"column": [["x" * 400_000, "db.s.t"]]}
+    for age, key in enumerate(("c", "b", "a")):
+        cache.put(key, value)
+        _age(cache._path(key), 100 - age)
+    # reading an entry makes it the most recently used one
+    _age(cache._path("c"), 200)
+    assert cache.get("c") == value
+    assert cache.evict() == 1
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+    assert cache.evict() == 0
+
+
+def test_warm_cache_run_matches_cold_run(extractor, example_parents, run_cli, tmp_path):
+    cache = LineageCache(str(tmp_path / "cache"))
+    assert dict(extractor.iter_lineage_to_direct_parents(cache=cache)) == example_parents
+    assert (cache.hits, cache.misses) == (0, len(example_parents))
+    assert dict(extractor.iter_lineage_to_direct_parents(workers=2, cache=cache)) == example_parents
+    assert cache.hits == len(example_parents)
+
+    for run in ("cold", "warm"):
+        output_dir = tmp_path / run
+        output_dir.mkdir()
+        run_cli(
+            cli_direct.main,
+            "--manifest", MANIFEST_PATH,
+            "--catalog", CATALOG_PATH,
+            "--output-dir", str(output_dir),
+            "--cache-dir", str(tmp_path / "cli_cache"),
+        )
+        for file_name, expected_path in (
+            ("lineage_to_direct_parents.json", EXAMPLE_PARENTS_PATH),
+            ("lineage_to_direct_children.json", EXAMPLE_CHILDREN_PATH),
+        ):
+            with open(expected_path, "rb") as file:
+                assert (output_dir / file_name).read_bytes() == file.read()
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct
+from dbt_column_lineage_extractor.store import LineageStore
+
+from conftest import CATALOG_PATH, EXAMPLE_CHILDREN_PATH, EXAMPLE_PARENTS_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _run(run_cli, output_dir, *args):
+    run_cli(
+        cli_direct.main,
+        "--manifest", MANIFEST_PATH,
+        "--catalog", CATALOG_PATH,
+        "--output-dir", str(output_dir),
+        *args,
+    )
+
+
+def _read_ndjson(file_path):
+    lineage = {}
+    with open(file_path) as file:
+        for line in file:
+            item = json.loads(line)
+            lineage[item["dbt_node"]] = item["columns"]
+    return lineage
+
+
+def test_ndjson_output_matches_json_output(run_cli, tmp_path, example_parents, example_children):
+    _run(run_cli, tmp_path, "--output-format", "ndjson")
+    for file_name, expected in (
+        ("lineage_to_direct_parents.ndjson", example_parents),
+        ("lineage_to_direct_children.ndjson", example_children),
+    ):
+        lineage = _read_ndjson(tmp_path / file_name)
+        assert lineage == expected
+        assert list(lineage) == list(expected)
+    assert not (tmp_path / "lineage_to_direct_parents.json").exists()
+
+
+@pytest.mark.parametrize("output_format", ["sqlite", "both"])
+def test_sqlite_output_matches_json_output(run_cli, tmp_path, example_parents, example_children, output_format):
+    _run(run_cli, tmp_path, "--output-format", output_format)
+    store = LineageStore(str(tmp_path / "lineage.db"))
+    try:
+        assert list(store.to_lineage_to_direct_parents().items()) == list(example_parents.items())
+        assert list(store.to_lineage_to_direct_children().items()) == list(example_children.items())
+    finally:
+        store.close()
+
+    json_written = output_format == "both"
+    assert (tmp_path / "lineage_to_direct_parents.json").exists() == json_written
+    if json_written:
+        for file_name, expected_path in (
+            ("lineage_to_direct_parents.json", EXAMPLE_PARENTS_PATH),
+            ("lineage_to_direct_children.json", EXAMPLE_CHILDREN_PATH),
+        ):
+            with open(expected_path, "rb") as file:
+                assert (tmp_path / file_name).read_bytes() == file.read()
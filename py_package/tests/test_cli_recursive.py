@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import cli_recursive, graph
+
+from conftest import EXAMPLE_CHILDREN_PATH, EXAMPLE_PARENTS_PATH
+
+
+def _lineage_args(*args):
+    return (
+        "--lineage-parents-file", EXAMPLE_PARENTS_PATH,
+        "--lineage-children-file", EXAMPLE_CHILDREN_PATH,
+        *args,
+    )
+
+
+def test_batch_queries(run_cli, tmp_path, example_parents, example_children):
+    queries = [("model.jaffle_shop.orders", "amount"), ("model.jaffle_shop.stg_orders", "order_id")]
+    input_path = tmp_path / "queries.csv"
+    input_path.write_text("model,column\n" + "".join(f"{model},{column}\n" for model, column in queries))
+    output_path = tmp_path / "results.ndjson"
+
+    run_cli(cli_recursive.main, *_lineage_args("--input", str(input_path), "--output", str(output_path)))
+
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert len(results) == len(queries)
+    for (model, column), result in zip(queries, results):
+        for key, lineage_map in (("ancestors", example_parents), ("descendants", example_children)):
+            expected = graph.find_all_related(lineage_map, model, column)
+            assert {node: sorted(columns) for node, columns in result[key].items()} == {
+                node: sorted(columns) for node, columns in expected.items()
+            }
+
+
+def test_max_depth_is_rejected_with_input(run_cli, tmp_path, capsys):
+    input_path = tmp_path / "queries.csv"
+    input_path.write_text("model,column\nmodel.jaffle_shop.orders,amount\n")
+    with pytest.raises(SystemExit):
+        run_cli(cli_recursive.main, *_lineage_args("--input", str(input_path), "--max-depth", "1"))
+    assert "--max-depth is not supported with --input" in capsys.readouterr().err
@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import DbtColumnLineageExtractor, graph
+from dbt_column_lineage_extractor import extractor as extractor_module
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+# raw -> a -> b, a -> c, and b, c -> d
+DIAMOND = {
+    "seed.p.raw": ([], None, ["id", "x", "y"]),
+    "model.p.a": (["seed.p.raw"], "select id, x, y from db.s.raw", ["id", "x", "y"]),
+    "model.p.b": (["model.p.a"], "select id, x as bx from db.s.a", ["id", "bx"]),
+    "model.p.c": (["model.p.a"], "select id, y as cy from db.s.a", ["id", "cy"]),
+    "model.p.d": (
+        ["model.p.b", "model.p.c"],
+        "select b.id, b.bx, c.cy from db.s.b as b join db.s.c as c on b.id = c.id",
+        ["id", "bx", "cy"],
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def diamond(tmp_path_factory):
+    manifest = {"nodes": {}, "sources": {}}
+    catalog = {"nodes": {}, "sources": {}}
+    for unique_id, (parents, sql, columns) in DIAMOND.items():
+        resource_type, _, name = unique_id.split(".")
+        manifest["nodes"][unique_id] = {
+            "resource_type": resource_type,
+            "path": f"{name}.sql",
+            "original_file_path": f"models/{name}.sql",
+            "database": "db",
+            "schema": "s",
+            "name": name,
+            "relation_name": f"db.s.{name}",
+            "columns": {},
+            "depends_on": {"nodes": parents},
+            "compiled_code": sql,
+        }
+        catalog["nodes"][unique_id] = {
+            "metadata": {"database": "DB", "schema": "S", "name": name.upper()},
+            "columns": {column.upper(): {"type": "NUMBER"} for column in columns},
+        }
+    project_dir = tmp_path_factory.mktemp("diamond")
+    (project_dir / "manifest.json").write_text(json.dumps(manifest))
+    (project_dir / "catalog.json").write_text(json.dumps(catalog))
+    extractor = DbtColumnLineageExtractor(
+        manifest_path=str(project_dir / "manifest.json"), catalog_path=str(project_dir / "catalog.json")
+    )
+    return extractor, extractor.build_lineage_to_direct_parents()
+
+
+@pytest.fixture
+def extracted_models(monkeypatch):
+    extracted = []
+    extract = extractor_module._extract_table_leaves_for_model
+
+    def counting_extract(task):
+        extracted.append((task[0], task[3]))
+        return extract(task)
+
+    monkeypatch.setattr(extractor_module, "_extract_table_leaves_for_model", counting_extract)
+    return extracted
+
+
+def _filter(lineage_to_direct_parents, selected_columns):
+    return {
+        model_node: {
+            column: parents for column, parents in columns.items() if column in selected_columns[model_node]
+        }
+        for model_node, columns in lineage_to_direct_parents.items()
+        if model_node in selected_columns
+    }
+
+
+def _get_upstream_columns(lineage_to_direct_parents, selected_columns):
+    # the selected columns and every model column they reach
+    upstream_columns = {model_node: set(columns) for model_node, columns in selected_columns.items()}
+    for model_node, columns in selected_columns.items():
+        for column in columns:
+            for related_model, related_columns in graph.find_all_related(
+                lineage_to_direct_parents, model_node, column
+            ).items():
+                if related_model in lineage_to_direct_parents:
+                    upstream_columns.setdefault(related_model, set()).update(related_columns)
+    return upstream_columns
+
+
+@pytest.mark.parametrize("upstream", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pushed_down_run_matches_filtered_full_run(extractor, example_parents, upstream, workers):
+    selected_columns = extractor.select_columns(["orders:amount", "orders:*_id", "stg_customers:first_name"])
+    assert selected_columns == {
+        "model.jaffle_shop.orders": {"amount", "order_id", "customer_id"},
+        "model.jaffle_shop.stg_customers": {"first_name"},
+    }
+    lineage = list(extractor.iter_lineage_for_columns(selected_columns, upstream=upstream, workers=workers))
+
+    if upstream:
+        selected_columns = _get_upstream_columns(example_parents, selected_columns)
+        assert "model.jaffle_shop.stg_payments" in selected_columns
+    expected = _filter(example_parents, selected_columns)
+    assert dict(lineage) == expected
+    assert [model_node for model_node, _ in lineage] == list(expected)
+
+
+def test_upstream_closure_of_a_diamond(diamond, extracted_models):
+    extractor, lineage_to_direct_parents = diamond
+    selected_columns = {"model.p.d": {"bx", "cy"}}
+    lineage = dict(extractor.iter_lineage_for_columns(selected_columns, upstream=True))
+
+    upstream_columns = _get_upstream_columns(lineage_to_direct_parents, selected_columns)
+    assert upstream_columns == {
+        "model.p.d": {"bx", "cy"},
+        "model.p.b": {"bx"},
+        "model.p.c": {"cy"},
+        "model.p.a": {"x", "y"},
+    }
+    assert lineage == _filter(lineage_to_direct_parents, upstream_columns)
+    # children first, and a once, with the columns reached through both b and c
+    assert [model_node for model_node, _ in extracted_models] == [
+        "model.p.d",
+        "model.p.b",
+        "model.p.c",
+        "model.p.a",
+    ]
+    assert sorted(extracted_models[-1][1]) == ["X", "Y"]
+
+
+def test_upstream_waves_of_a_diamond(diamond):
+    extractor, _ = diamond
+    assert list(extractor._get_upstream_waves(["model.p.d"])) == [
+        ["model.p.d"],
+        ["model.p.b", "model.p.c"],
+        ["model.p.a"],
+    ]
+    assert list(extractor._get_upstream_waves(["model.p.b", "model.p.d"])) == [
+        ["model.p.d"],
+        ["model.p.b", "model.p.c"],
+        ["model.p.a"],
+    ]
@@ -0,0 +1,66 @@
+import pytest
+from sqlglot.lineage import lineage
+
+from dbt_column_lineage_extractor import ModelLineageEngine, utils
+from dbt_column_lineage_extractor import cli_direct
+from dbt_column_lineage_extractor import extractor as extractor_module
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _describe(node):
+    return (
+        node.name,
+        node.source.sql(),
+        node.expression.sql(),
+        [_describe(child) for child in node.downstream],
+    )
+
+
+def test_engine_matches_sqlglot_lineage(extractor):
+    for model_node in extractor.selected_models:
+        model_info = extractor.manifest["nodes"][model_node]
+        schema = extractor.schema_index.get_schema_dict(model_info["depends_on"]["nodes"])
+        engine = ModelLineageEngine(model_info["compiled_code"], schema=schema, dialect=extractor.dialect)
+        columns = extractor._get_list_of_columns_for_a_dbt_node(model_node)
+        assert columns
+        for column in columns:
+            expected = lineage(column, model_info["compiled_code"], schema=schema, dialect=extractor.dialect)
+            assert _describe(engine.lineage_for_column(column)) == _describe(expected), (model_node, column)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cli_direct_matches_example_outputs(run_cli, tmp_path, example_parents, example_children, workers):
+    run_cli(
+        cli_direct.main,
+        "--manifest", MANIFEST_PATH,
+        "--catalog", CATALOG_PATH,
+        "--output-dir", str(tmp_path),
+        "--workers", str(workers),
+    )
+    assert utils.read_dict_from_file(tmp_path / "lineage_to_direct_parents.json") == example_parents
+    assert utils.read_dict_from_file(tmp_path / "lineage_to_direct_children.json") == example_children
+
+
+def test_build_lineage_to_direct_parents_matches_lineage_map(extractor):
+    expected = extractor.get_columns_lineage_from_sqlglot_lineage_map(extractor.build_lineage_map())
+    assert extractor.build_lineage_to_direct_parents() == expected
+
+
+def test_table_leaves_walk_repeated_ctes_once():
+    # every CTE is referenced twice, so sqlglot's tree doubles at each layer
+    sql = """
+    with base as (select a from db.sch.t),
+    l1 as (select b1.a + b2.a as a from base as b1 join base as b2 on b1.a = b2.a),
+    l2 as (select x.a + y.a as a from l1 as x join l1 as y on x.a = y.a)
+    select a from l2
+    """
+    engine = ModelLineageEngine(sql, schema={"db": {"sch": {"t": {"a": "int"}}}})
+    node = engine.lineage_for_columns(["a"])["a"]
+
+    assert len(list(node.walk())) == 12
+    # a, l2.a, x.a, y.a, b1.a, b2.a and the table leaf t.a
+    assert len(list(extractor_module._iter_distinct_lineage_nodes(node))) == 7
+    assert extractor_module.get_table_leaves_from_sqlglot_lineage_node(node) == [("a", "db.sch.t")]
@@ -0,0 +1,157 @@
+import pytest
+
+from dbt_column_lineage_extractor import graph
+from dbt_column_lineage_extractor.graph import ColumnLineageGraph
+
+
+def _edges_to_lineage_map(edges):
+    lineage_map = {}
+    for (model_node, column), (related_model, related_column) in edges:
+        lineage_map.setdefault(model_node, {}).setdefault(column, []).append(
+            {"dbt_node": related_model, "column": related_column}
+        )
+    return lineage_map
+
+
+def _flatten(structure):
+    # iteratively, as structures of deep chains are nested beyond the recursion limit
+    nodes = []
+    stack = [structure]
+    while stack:
+        for model_node, columns in stack.pop().items():
+            for column, subsequent in columns.items():
+                nodes.append((model_node, column))
+                stack.append(subsequent["+"])
+    return nodes
+
+
+def _squashed_nodes(related):
+    return {(model_node, column) for model_node, columns in related.items() for column in columns}
+
+
+@pytest.fixture
+def shortcut_lineage_map():
+    # a -> b -> c -> d, plus the shortcut a -> c
+    return _edges_to_lineage_map(
+        [
+            (("a", "id"), ("b", "id")),
+            (("b", "id"), ("c", "id")),
+            (("c", "id"), ("d", "id")),
+            (("a", "id"), ("c", "id")),
+        ]
+    )
+
+
+def test_structure_with_max_depth_reaches_nodes_through_shortcuts(shortcut_lineage_map):
+    structure = graph.find_all_related_with_structure(shortcut_lineage_map, "a", "id", max_depth=2)
+    assert structure == {
+        "b": {"id": {"+": {}}},
+        "c": {"id": {"+": {"d": {"id": {"+": {}}}}}},
+    }
+    assert graph.find_all_related(shortcut_lineage_map, "a", "id", max_depth=2) == {
+        "b": ["id"],
+        "c": ["id"],
+        "d": ["id"],
+    }
+
+
+@pytest.mark.parametrize("max_depth", [None, 1, 2, 3, 4])
+def test_structure_and_squashed_reach_the_same_nodes(example_parents, example_children, max_depth):
+    for lineage_map in (example_parents, example_children):
+        lineage_graph = ColumnLineageGraph(lineage_map)
+        for model_node, columns in lineage_map.items():
+            for column in columns:
+                squashed = graph.find_all_related(lineage_map, model_node, column, max_depth=max_depth)
+                structure = graph.find_all_related_with_structure(
+                    lineage_map, model_node, column, max_depth=max_depth
+                )
+                assert set(_flatten(structure)) == _squashed_nodes(squashed)
+                assert lineage_graph.find_all_related(model_node, column, max_depth) == squashed
+                assert (
+                    lineage_graph.find_all_related_with_structure(model_node, column, max_depth)
+                    == structure
+                )
+
+
+def test_reversed_graph_matches_children_map(example_parents, example_children):
+    reversed_graph = ColumnLineageGraph(example_parents).reversed()
+    for model_node, columns in example_children.items():
+        for column in columns:
+            assert reversed_graph.find_all_related_with_structure(
+                model_node, column
+            ) == graph.find_all_related_with_structure(example_children, model_node, column)
+
+
+def test_deep_chain_does_not_recurse():
+    depth = 5000
+    lineage_map = _edges_to_lineage_map(
+        [((f"m{i}", "id"), (f"m{i + 1}", "id")) for i in range(depth)]
+    )
+    assert len(graph.find_all_related(lineage_map, "m0", "id")) == depth
+    assert len(_flatten(graph.find_all_related_with_structure(lineage_map, "m0", "id"))) == depth
+
+
+
+def test_batch_closures_match_find_all_related_with_cycles():
+    # two cycles, b <-> c and e -> f -> g -> e, sharing the upstream node h
+    lineage_map = _edges_to_lineage_map(
+        [
+            (("a", "x"), ("b", "x")),
+            (("b", "x"), ("c", "x")),
+            (("c", "x"), ("b", "x")),
+            (("c", "x"), ("d", "x")),
+            (("a", "x"), ("e", "x")),
+            (("e", "x"), ("f", "x")),
+            (("f", "x"), ("g", "x")),
+            (("g", "x"), ("e", "x")),
+            (("g", "x"), ("h", "x")),
+            (("d", "x"), ("h", "x")),
+        ]
+    )
+    lineage_graph = ColumnLineageGraph(lineage_map)
+    queries = [(model_node, "x") for model_node in "abcdefgh"] + [("missing", "x")]
+    # twice, the second call answering from the memoized closures
+    for _ in range(2):
+        results = list(lineage_graph.find_all_related_batch(queries))
+        assert [(model_node, column) for model_node, column, _ in results] == queries
+        for model_node, column, related in results:
+            expected = graph.find_all_related(lineage_map, model_node, column)
+            assert _squashed_nodes(related) == _squashed_nodes(expected)
+    # b is its own ancestor through the cycle with c
+    assert results[1][2] == {"b": ["x"], "c": ["x"], "d": ["x"], "h": ["x"]}
+
+
+def test_compact_lineage_round_trip(example_parents, example_children):
+    lineage = graph.CompactLineage()
+    for model_node, columns in example_parents.items():
+        lineage.add_model(model_node, columns)
+    assert len(lineage) == len(example_parents)
+    assert lineage.edge_count == sum(
+        len(parents) for columns in example_parents.values() for parents in columns.values()
+    )
+    assert list(lineage.iter_parents()) == list(example_parents.items())
+    assert list(lineage.iter_children()) == list(example_children.items())
+
+
+def test_compact_lineage_children_match_inverted_parents():
+    # mixed case names, a model without columns, and a parent column shared by two models
+    parents = {
+        "model.p.B": {"X": [{"column": "ID", "dbt_node": "model.p.A"}, {"column": "name", "dbt_node": "seed.p.s"}]},
+        "model.p.empty": {},
+        "model.p.c": {
+            "y": [{"column": "id", "dbt_node": "model.p.a"}],
+            "z": [],
+            "w": [{"column": "x", "dbt_node": "model.p.B"}, {"column": "Id", "dbt_node": "model.p.A"}],
+        },
+    }
+    lineage = graph.CompactLineage()
+    for model_node, columns in parents.items():
+        lineage.add_model(model_node, columns)
+    assert dict(lineage.iter_parents()) == parents
+    expected = graph.get_lineage_to_direct_children(parents)
+    assert list(lineage.iter_children()) == list(expected.items())
+    assert expected["model.p.a"]["id"] == [
+        {"column": "x", "dbt_node": "model.p.b"},
+        {"column": "y", "dbt_node": "model.p.c"},
+        {"column": "w", "dbt_node": "model.p.c"},
+    ]
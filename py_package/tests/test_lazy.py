@@ -0,0 +1,57 @@
+import pytest
+
+from dbt_column_lineage_extractor import graph
+from dbt_column_lineage_extractor.lazy import LazyLineageResolver
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _get_child_models(extractor, nodes):
+    return {
+        model_node
+        for model_node in extractor.selected_models
+        if set(extractor.manifest["nodes"][model_node]["depends_on"]["nodes"]) & nodes
+    }
+
+
+def test_lazy_ancestors(extractor, example_parents):
+    for model_node, columns in example_parents.items():
+        for column in columns:
+            resolver = LazyLineageResolver(extractor)
+            related = graph.find_all_related(resolver.lineage_to_direct_parents, model_node, column)
+            assert related == graph.find_all_related(example_parents, model_node, column)
+            # the queried model and the models it reaches, not the rest of the project
+            assert set(resolver.extracted_models) == {model_node} | (
+                set(related) & set(extractor.selected_models)
+            )
+
+
+def test_lazy_descendants(extractor, example_children):
+    for node, columns in example_children.items():
+        for column in columns:
+            resolver = LazyLineageResolver(extractor)
+            related = graph.find_all_related(resolver.lineage_to_direct_children, node, column)
+            assert related == graph.find_all_related(example_children, node, column)
+            # the children of the queried node and of every node it reaches
+            assert set(resolver.extracted_models) == _get_child_models(extractor, {node} | set(related))
+
+
+def test_lazy_structure(extractor, example_parents):
+    resolver = LazyLineageResolver(extractor)
+    for model_node, columns in example_parents.items():
+        for column in columns:
+            assert graph.find_all_related_with_structure(
+                resolver.lineage_to_direct_parents, model_node, column
+            ) == graph.find_all_related_with_structure(example_parents, model_node, column)
+    assert dict(resolver.lineage_to_direct_parents["model.jaffle_shop.orders"]) == (
+        example_parents["model.jaffle_shop.orders"]
+    )
+
+
+def test_single_model_query_extracts_one_model(extractor):
+    resolver = LazyLineageResolver(extractor)
+    related = graph.find_all_related(
+        resolver.lineage_to_direct_parents, "model.jaffle_shop.stg_orders", "order_id"
+    )
+    assert related == {"seed.jaffle_shop.raw_orders": ["id"]}
+    assert resolver.extracted_models == ["model.jaffle_shop.stg_orders"]
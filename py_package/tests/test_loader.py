@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import loader
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+
+@pytest.fixture(params=["ijson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(loader, "ijson", None)
+    return request.param
+
+
+def test_load_manifest(backend):
+    with open(MANIFEST_PATH) as file:
+        manifest = json.load(file)
+    loaded = loader.load_manifest(MANIFEST_PATH)
+    assert list(loaded) == ["nodes", "sources"]
+    for key in ("nodes", "sources"):
+        assert list(loaded[key]) == list(manifest[key])
+        for node_id, node in loaded[key].items():
+            original = manifest[key][node_id]
+            for field in ("resource_type", "database", "schema", "name", "relation_name", "tags"):
+                assert node[field] == original.get(field, [] if field == "tags" else None)
+            assert node["depends_on"]["nodes"] == original.get("depends_on", {}).get("nodes", [])
+            if node["resource_type"] == "model":
+                assert node["compiled_code"] == original["compiled_code"]
+            else:
+                assert "compiled_code" not in node
+
+
+def test_load_catalog(backend):
+    with open(CATALOG_PATH) as file:
+        catalog = json.load(file)
+    loaded = loader.load_catalog(CATALOG_PATH)
+    for key in ("nodes", "sources"):
+        assert list(loaded[key]) == list(catalog[key])
+        for node_id, node in loaded[key].items():
+            original = catalog[key][node_id]
+            assert node["metadata"] == {
+                field: original["metadata"][field] for field in ("database", "schema", "name")
+            }
+            assert node["columns"] == {
+                col_name: {"type": col_info["type"]} for col_name, col_info in original["columns"].items()
+            }
+
+
+def test_backends_load_the_same_nodes(monkeypatch):
+    pytest.importorskip("ijson")
+    loaded = [loader.load_manifest(MANIFEST_PATH), loader.load_catalog(CATALOG_PATH)]
+    monkeypatch.setattr(loader, "ijson", None)
+    assert [loader.load_manifest(MANIFEST_PATH), loader.load_catalog(CATALOG_PATH)] == loaded
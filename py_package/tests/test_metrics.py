@@ -0,0 +1,67 @@
+import csv
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct, shard
+from dbt_column_lineage_extractor.cache import LineageCache
+from dbt_column_lineage_extractor.metrics import LineageMetrics
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_one_record_per_model(extractor, example_parents, workers):
+    metrics = LineageMetrics()
+    assert dict(extractor.iter_lineage_to_direct_parents(workers=workers, metrics=metrics)) == example_parents
+    assert sorted(metrics.models) == sorted(extractor.selected_models)
+    for model_node, record in metrics.models.items():
+        model_info = extractor.manifest["nodes"][model_node]
+        assert record["model_node"] == model_node
+        assert not record["cached"] and not record["template_hit"]
+        assert record["sql_size"] == len(model_info["compiled_code"])
+        assert record["parent_count"] == len(model_info["depends_on"]["nodes"])
+        assert record["column_count"] == len(example_parents[model_node])
+        assert record["error_count"] == 0 and record["not_found_count"] == 0
+        phase_seconds = [record[f"{phase}_seconds"] for phase in ("parse", "qualify", "lineage", "reduce")]
+        assert all(seconds >= 0 for seconds in phase_seconds)
+        assert 0 < sum(phase_seconds) <= record["seconds"]
+
+    totals = metrics.get_totals()
+    assert totals["models"] == len(extractor.selected_models)
+    assert totals["column_count"] == sum(len(columns) for columns in example_parents.values())
+    assert metrics.report(top_n=2).count("\n") == 3
+
+
+def test_cached_models(extractor, tmp_path):
+    cache = LineageCache(str(tmp_path))
+    list(extractor.iter_lineage_to_direct_parents(cache=cache))
+    metrics = LineageMetrics()
+    list(extractor.iter_lineage_to_direct_parents(cache=cache, metrics=metrics))
+    assert all(record["cached"] and record["seconds"] < 1 for record in metrics.models.values())
+    assert metrics.get_totals()["cached_models"] == len(extractor.selected_models)
+
+
+def test_cli_writes_metrics_and_profiles(run_cli, tmp_path, extractor):
+    profiled_model = "model.jaffle_shop.orders"
+    for file_name in ("metrics.json", "metrics.csv"):
+        run_cli(
+            cli_direct.main,
+            "--manifest", MANIFEST_PATH,
+            "--catalog", CATALOG_PATH,
+            "--output-dir", str(tmp_path),
+            "--metrics-out", str(tmp_path / file_name),
+            "--profile-model", profiled_model,
+        )
+    with open(tmp_path / "metrics.json") as file:
+        written = json.load(file)
+    assert [record["model_node"] for record in written["models"]] == extractor.selected_models
+    assert written["totals"]["models"] == len(extractor.selected_models)
+    with open(tmp_path / "metrics.csv", newline="") as file:
+        assert [row["model_node"] for row in csv.DictReader(file)] == extractor.selected_models
+    assert (tmp_path / f"{profiled_model}.prof").stat().st_size > 0
+    # the files are read back as shard costs
+    for file_name in ("metrics.json", "metrics.csv"):
+        assert sorted(shard.read_costs(str(tmp_path / file_name))) == sorted(extractor.selected_models)
@@ -0,0 +1,52 @@
+import pytest
+
+from dbt_column_lineage_extractor import loader
+from dbt_column_lineage_extractor.schema_index import SchemaIndex
+
+from conftest import CATALOG_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture
+def catalog():
+    return loader.load_catalog(CATALOG_PATH)
+
+
+def test_schema_dict_is_built_once(extractor):
+    assert extractor.schema_dict is extractor.schema_dict
+    assert extractor.schema_dict == extractor._generate_schema_dict_from_catalog()
+
+
+def test_schema_dict_slices(extractor, catalog):
+    schema_index = SchemaIndex(catalog)
+    for model_node in extractor.selected_models:
+        parents = extractor.manifest["nodes"][model_node]["depends_on"]["nodes"]
+        schema_dict = schema_index.get_schema_dict(parents)
+        for database, schemas in schema_dict.items():
+            for schema, tables in schemas.items():
+                for table, column_types in tables.items():
+                    assert column_types == extractor.schema_dict[database][schema][table]
+        assert schema_index.get_schema_dict(parents) is schema_dict
+
+
+def test_caches_are_bounded(catalog):
+    schema_index = SchemaIndex(catalog, cache_size=2)
+    nodes = list(catalog["nodes"])
+    first = schema_index.get_schema_dict([nodes[0]])
+    schema_index.get_schema_dict([nodes[1]])
+    # using the first parent list again keeps it over the second one
+    assert schema_index.get_schema_dict([nodes[0]]) is first
+    schema_index.get_schema_dict([nodes[2]])
+    assert list(schema_index._schema_dicts) == [(nodes[0],), (nodes[2],)]
+
+    for node in nodes[:3]:
+        schema_index.get_mapping_schema([node], "snowflake")
+    assert list(schema_index._mapping_schemas) == [((nodes[1],), "snowflake"), ((nodes[2],), "snowflake")]
+    assert len(schema_index._schema_dicts) == 2
+
+
+def test_missing_parent_warns(catalog):
+    schema_index = SchemaIndex(catalog)
+    with pytest.warns(UserWarning, match="not found in catalog"):
+        assert schema_index.get_schema_dict(["model.jaffle_shop.missing"]) == {}
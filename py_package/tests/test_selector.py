@@ -0,0 +1,72 @@
+import pytest
+
+from dbt_column_lineage_extractor import selector
+
+
+def _node(name, parents=(), resource_type="model", tags=(), path=None):
+    return {
+        "name": name,
+        "resource_type": resource_type,
+        "depends_on": {"nodes": list(parents)},
+        "tags": list(tags),
+        "original_file_path": path or f"models/{name}.sql",
+    }
+
+
+@pytest.fixture
+def manifest():
+    # raw -> stg_a -> int_a -> mart_a -> mart_b, and stg_a -> test_stg_a
+    return {
+        "nodes": {
+            "seed.p.raw": _node("raw", resource_type="seed", path="seeds/raw.csv"),
+            "model.p.stg_a": _node("stg_a", ["seed.p.raw"], tags=["staging"], path="models/staging/stg_a.sql"),
+            "model.p.int_a": _node("int_a", ["model.p.stg_a"]),
+            "model.p.mart_a": _node("mart_a", ["model.p.int_a"], tags=["finance"], path="models/marts/mart_a.sql"),
+            "model.p.mart_b": _node("mart_b", ["model.p.mart_a"], path="models/marts/mart_b.sql"),
+            "test.p.test_stg_a": _node("test_stg_a", ["model.p.stg_a"], resource_type="test"),
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "selectors, expected",
+    [
+        (["model.p.int_a"], ["model.p.int_a"]),
+        (["int_a"], ["model.p.int_a"]),
+        (["+mart_a"], ["model.p.stg_a", "model.p.int_a", "model.p.mart_a"]),
+        (["1+mart_a"], ["model.p.int_a", "model.p.mart_a"]),
+        (["stg_a+"], ["model.p.stg_a", "model.p.int_a", "model.p.mart_a", "model.p.mart_b"]),
+        (["stg_a+2"], ["model.p.stg_a", "model.p.int_a", "model.p.mart_a"]),
+        (["tag:finance+"], ["model.p.mart_a", "model.p.mart_b"]),
+        (["path:models/marts"], ["model.p.mart_a", "model.p.mart_b"]),
+        (["model.p.mart_*"], ["model.p.mart_a", "model.p.mart_b"]),
+        (["mart_b", "stg_a"], ["model.p.stg_a", "model.p.mart_b"]),
+        (["seed.p.raw"], ["seed.p.raw"]),
+    ],
+)
+def test_select_models(manifest, selectors, expected):
+    assert selector.select_models(manifest, selectors) == expected
+
+
+def test_select_models_keeps_unmatched_unique_ids(manifest):
+    with pytest.warns(UserWarning, match="does not match any node"):
+        assert selector.select_models(manifest, ["model.p.missing", "tag:missing"]) == ["model.p.missing"]
+
+
+def test_select_columns(manifest):
+    columns = {"model.p.int_a": ["ID", "AMOUNT_USD"], "model.p.mart_a": ["ID", "TOTAL_AMOUNT"]}
+    models = list(columns)
+
+    def get_columns(node):
+        return columns[node]
+
+    assert selector.select_columns(manifest, models, ["+mart_a:*amount*"], get_columns) == {
+        "model.p.int_a": {"amount_usd"},
+        "model.p.mart_a": {"total_amount"},
+    }
+    assert selector.select_columns(manifest, models, ["id"], get_columns) == {
+        "model.p.int_a": {"id"},
+        "model.p.mart_a": {"id"},
+    }
+    with pytest.warns(UserWarning, match="does not match any column"):
+        assert selector.select_columns(manifest, models, ["mart_a:*email*"], get_columns) == {}
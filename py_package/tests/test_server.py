@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+from dbt_column_lineage_extractor import graph
+from dbt_column_lineage_extractor.server import LineageQueryService
+from dbt_column_lineage_extractor.store import write_lineage_store
+
+from conftest import EXAMPLE_PARENTS_PATH
+
+
+@pytest.fixture
+def parents_file(tmp_path):
+    file_path = tmp_path / "lineage_to_direct_parents.json"
+    shutil.copy(EXAMPLE_PARENTS_PATH, file_path)
+    return str(file_path)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def service(request, parents_file, tmp_path, example_parents):
+    if request.param == "json":
+        return LineageQueryService(lineage_parents_file=parents_file)
+    store_path = str(tmp_path / "lineage.db")
+    write_lineage_store(example_parents, store_path)
+    return LineageQueryService(lineage_store=store_path)
+
+
+@pytest.mark.parametrize("structured", [False, True])
+@pytest.mark.parametrize("max_depth", [None, 1])
+def test_query(service, example_parents, example_children, structured, max_depth):
+    find_all_related = graph.find_all_related_with_structure if structured else graph.find_all_related
+    for direction, lineage_map in (("ancestors", example_parents), ("descendants", example_children)):
+        for model, columns in lineage_map.items():
+            for column in columns:
+                result = json.loads(service.query(direction, model, column, structured, max_depth))
+                assert result == {
+                    "model": model,
+                    "column": column,
+                    direction: find_all_related(lineage_map, model, column, max_depth=max_depth),
+                }
+    misses = service.cache.misses
+    service.query("ancestors", "model.jaffle_shop.orders", "amount", structured, max_depth)
+    assert service.cache.misses == misses
+
+
+def test_reload_if_changed(parents_file, example_parents):
+    service = LineageQueryService(lineage_parents_file=parents_file)
+    assert not service.reload_if_changed()
+    query = ("ancestors", "model.jaffle_shop.orders", "amount")
+    assert json.loads(service.query(*query))["ancestors"]
+    status = service.get_status()
+    assert status["generation"] == 1 and status["cache_size"] == 1
+
+    lineage = {model: columns for model, columns in example_parents.items() if model != "model.jaffle_shop.orders"}
+    with open(parents_file, "w") as file:
+        json.dump(lineage, file)
+    stat = os.stat(parents_file)
+    os.utime(parents_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert service.reload_if_changed()
+
+    assert json.loads(service.query(*query))["ancestors"] == {}
+    status = service.get_status()
+    assert status["generation"] == 2
+    assert status["columns"] == len(graph.ColumnLineageGraph(lineage))
+
+
+def test_invalid_arguments(parents_file):
+    with pytest.raises(ValueError):
+        LineageQueryService()
+    with pytest.raises(ValueError):
+        LineageQueryService(lineage_parents_file=parents_file).query("siblings", "model", "column")
+
+
+def test_cached_responses_keep_the_requested_casing(service):
+    upper = json.loads(service.query("ancestors", "MODEL.JAFFLE_SHOP.ORDERS", "AMOUNT"))
+    lower = json.loads(service.query("ancestors", "model.jaffle_shop.orders", "amount"))
+    assert (upper["model"], upper["column"]) == ("MODEL.JAFFLE_SHOP.ORDERS", "AMOUNT")
+    assert (lower["model"], lower["column"]) == ("model.jaffle_shop.orders", "amount")
+    assert upper["ancestors"] == lower["ancestors"] != {}
+
+
+def test_store_connection_is_shared_between_threads(tmp_path, example_parents):
+    store_path = str(tmp_path / "lineage.db")
+    write_lineage_store(example_parents, store_path)
+    service = LineageQueryService(lineage_store=store_path, cache_size=0)
+    store = service._snapshot[1][0]
+    queries = [(model, column) for model, columns in example_parents.items() for column in columns]
+    results = {}
+
+    def run(model, column):
+        results[(model, column)] = json.loads(service.query("ancestors", model, column))["ancestors"]
+
+    # a thread per query, like ThreadingHTTPServer starts one per request
+    threads = [threading.Thread(target=run, args=query) for query in queries * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {query: graph.find_all_related(example_parents, *query) for query in queries}
+    assert service._snapshot[1][0] is store
+
+    write_lineage_store({}, store_path)
+    stat = os.stat(store_path)
+    os.utime(store_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert service.reload_if_changed()
+    assert service._snapshot[1][0] is not store
+    assert json.loads(service.query("ancestors", *queries[0]))["ancestors"] == {}
@@ -0,0 +1,76 @@
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct, cli_merge, loader, shard
+
+from conftest import CATALOG_PATH, EXAMPLE_CHILDREN_PATH, EXAMPLE_PARENTS_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture(scope="module")
+def manifest():
+    return loader.load_manifest(MANIFEST_PATH)
+
+
+def test_parse_shard():
+    assert shard.parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            shard.parse_shard(value)
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 7])
+def test_shards_partition_the_models(manifest, shard_count):
+    models = [node for node, info in manifest["nodes"].items() if info["resource_type"] == "model"]
+    costs = {models[0]: 10.0, models[1]: 0.5}
+    for model_costs in (None, costs):
+        shards = [
+            shard.get_shard_models(manifest, models, index, shard_count, model_costs)
+            for index in range(1, shard_count + 1)
+        ]
+        assigned = [model_node for shard_models in shards for model_node in shard_models]
+        assert sorted(assigned) == sorted(models)
+        for shard_models in shards:
+            assert shard_models == [model_node for model_node in models if model_node in shard_models]
+
+
+def test_merge_shards_rejects_duplicate_models(example_parents):
+    model_node = next(iter(example_parents))
+    with pytest.raises(ValueError, match="several shards"):
+        shard.merge_shards([example_parents, {model_node: example_parents[model_node]}])
+
+
+def test_check_shard_files():
+    shard.check_shard_files(["lineage_to_direct_parents.json"])
+    shard.check_shard_files([shard.get_shard_file_name(i, 2) for i in (2, 1)])
+    with pytest.raises(ValueError, match="missing \\[2\\]"):
+        shard.check_shard_files([shard.get_shard_file_name(i, 3) for i in (1, 3)])
+    with pytest.raises(ValueError, match="different shard counts"):
+        shard.check_shard_files([shard.get_shard_file_name(1, 2), shard.get_shard_file_name(2, 3)])
+
+
+def test_sharded_run_matches_full_run(run_cli, tmp_path):
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    for index in (1, 2, 3):
+        run_cli(
+            cli_direct.main,
+            "--manifest", MANIFEST_PATH,
+            "--catalog", CATALOG_PATH,
+            "--output-dir", str(shard_dir),
+            "--shard", f"{index}/3",
+        )
+    assert len(shard.find_shard_files(str(shard_dir))) == 3
+
+    run_cli(
+        cli_merge.main,
+        "--input-dir", str(shard_dir),
+        "--manifest", MANIFEST_PATH,
+        "--output-dir", str(tmp_path),
+    )
+    for file_name, expected_path in (
+        ("lineage_to_direct_parents.json", EXAMPLE_PARENTS_PATH),
+        ("lineage_to_direct_children.json", EXAMPLE_CHILDREN_PATH),
+    ):
+        with open(expected_path, "rb") as file:
+            assert (tmp_path / file_name).read_bytes() == file.read()
@@ -0,0 +1,75 @@
+import copy
+import json
+import shutil
+
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct, state
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+@pytest.fixture
+def artifacts():
+    with open(MANIFEST_PATH) as file:
+        manifest = json.load(file)
+    with open(CATALOG_PATH) as file:
+        catalog = json.load(file)
+    return manifest, catalog
+
+
+def _write(path, value):
+    with open(path, "w") as file:
+        json.dump(value, file)
+    return str(path)
+
+
+def test_get_modified_models(artifacts):
+    manifest, catalog = artifacts
+    models = [node for node, info in manifest["nodes"].items() if info["resource_type"] == "model"]
+    new_manifest, new_catalog = copy.deepcopy(manifest), copy.deepcopy(catalog)
+    new_manifest["nodes"]["model.jaffle_shop.stg_orders"]["compiled_code"] += "\n-- changed"
+    # a new column of stg_customers changes the schema slice of its children
+    new_catalog["nodes"]["model.jaffle_shop.stg_customers"]["columns"]["EMAIL"] = {"type": "TEXT"}
+
+    modified, removed = state.get_modified_models(manifest, catalog, new_manifest, new_catalog, models)
+    assert modified == [
+        node
+        for node in models
+        if node in ("model.jaffle_shop.stg_orders", "model.jaffle_shop.stg_customers", "model.jaffle_shop.customers")
+    ]
+    assert removed == []
+
+    del new_manifest["nodes"]["model.jaffle_shop.stg_payments"]
+    _, removed = state.get_modified_models(manifest, catalog, new_manifest, new_catalog, models)
+    assert removed == ["model.jaffle_shop.stg_payments"]
+
+
+def test_state_run_matches_full_run(run_cli, tmp_path, artifacts):
+    manifest, catalog = artifacts
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    run_cli(cli_direct.main, "--manifest", MANIFEST_PATH, "--catalog", CATALOG_PATH, "--output-dir", str(state_dir))
+    shutil.copy(MANIFEST_PATH, state_dir / "manifest.json")
+    shutil.copy(CATALOG_PATH, state_dir / "catalog.json")
+
+    # stg_customers comes before other models in the manifest, so it must not be moved last
+    node = manifest["nodes"]["model.jaffle_shop.stg_customers"]
+    node["compiled_code"] = node["compiled_code"].replace("last_name", "last_name || '' as last_name")
+    manifest_path = _write(tmp_path / "manifest.json", manifest)
+    catalog_path = _write(tmp_path / "catalog.json", catalog)
+
+    for output_dir, extra_args in (("full", []), ("incremental", ["--state-dir", str(state_dir)])):
+        (tmp_path / output_dir).mkdir()
+        run_cli(
+            cli_direct.main,
+            "--manifest", manifest_path,
+            "--catalog", catalog_path,
+            "--output-dir", str(tmp_path / output_dir),
+            *extra_args,
+        )
+    for file_name in ("lineage_to_direct_parents.json", "lineage_to_direct_children.json"):
+        full = (tmp_path / "full" / file_name).read_bytes()
+        assert (tmp_path / "incremental" / file_name).read_bytes() == full
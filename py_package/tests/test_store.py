@@ -0,0 +1,72 @@
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct, graph
+from dbt_column_lineage_extractor.store import LineageStore, write_lineage_store
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def _to_dict(lineage_map):
+    return {
+        node: {column: list(related) for column, related in columns.items()}
+        for node, columns in lineage_map.items()
+    }
+
+
+@pytest.fixture
+def store(tmp_path, example_parents):
+    file_path = tmp_path / "lineage.db"
+    write_lineage_store(example_parents, str(file_path))
+    store = LineageStore(str(file_path))
+    yield store
+    store.close()
+
+
+def test_store_round_trip(store, example_parents, example_children):
+    assert store.to_lineage_to_direct_parents() == example_parents
+    assert list(store.to_lineage_to_direct_parents()) == list(example_parents)
+    assert store.to_lineage_to_direct_children() == example_children
+    assert _to_dict(store.lineage_to_direct_parents) == example_parents
+    assert _to_dict(store.lineage_to_direct_children) == example_children
+
+
+def test_store_lookups(store, example_parents, example_children):
+    assert store.get_direct_parents("model.jaffle_shop.orders", "amount") == (
+        example_parents["model.jaffle_shop.orders"]["amount"]
+    )
+    assert store.get_direct_parents("model.jaffle_shop.orders", "missing") == []
+    assert "model.jaffle_shop.missing" not in store.lineage_to_direct_parents
+    with pytest.raises(KeyError):
+        store.lineage_to_direct_children["model.jaffle_shop.orders"]["missing"]
+
+    for store_map, lineage_map in (
+        (store.lineage_to_direct_parents, example_parents),
+        (store.lineage_to_direct_children, example_children),
+    ):
+        for node, columns in lineage_map.items():
+            for column in columns:
+                assert graph.find_all_related_with_structure(
+                    store_map, node, column
+                ) == graph.find_all_related_with_structure(lineage_map, node, column)
+
+
+def test_missing_store_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LineageStore(str(tmp_path / "missing.db"))
+
+
+def test_cli_direct_writes_store(run_cli, tmp_path, example_parents):
+    run_cli(
+        cli_direct.main,
+        "--manifest", MANIFEST_PATH,
+        "--catalog", CATALOG_PATH,
+        "--output-dir", str(tmp_path),
+        "--output-format", "sqlite",
+    )
+    store = LineageStore(str(tmp_path / "lineage.db"))
+    try:
+        assert store.to_lineage_to_direct_parents() == example_parents
+    finally:
+        store.close()
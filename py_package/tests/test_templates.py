@@ -0,0 +1,99 @@
+import copy
+import json
+
+import pytest
+
+from dbt_column_lineage_extractor import DbtColumnLineageExtractor, LineageTemplates
+
+from conftest import CATALOG_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+ORDERS_TYPES = {"id": "NUMBER", "user_id": "NUMBER"}
+
+
+def test_make_key():
+    templates = LineageTemplates()
+    sql = "select id, user_id from {} join {}_v2 using (id)"
+    key, tables = templates.make_key(
+        sql.format("db.eu.orders", "db.eu.orders"),
+        [("db.eu.orders", ORDERS_TYPES), ("db.eu.orders_v2", ORDERS_TYPES)],
+        ["id", "user_id"],
+        "snowflake",
+    )
+    assert tables == ["db.eu.orders", "db.eu.orders_v2"]
+    us_key, us_tables = templates.make_key(
+        sql.format("DB.US.ORDERS", "DB.US.ORDERS"),
+        [("DB.US.ORDERS", ORDERS_TYPES), ("DB.US.ORDERS_v2", ORDERS_TYPES)],
+        ["id", "user_id"],
+        "snowflake",
+    )
+    assert us_key == key
+    assert us_tables == ["db.us.orders", "db.us.orders_v2"]
+
+    # different parent columns, and relations that aren't fully qualified
+    assert templates.make_key(
+        sql.format("db.us.orders", "db.us.orders"),
+        [("db.us.orders", {"id": "NUMBER"}), ("db.us.orders_v2", ORDERS_TYPES)],
+        ["id", "user_id"],
+        "snowflake",
+    )[0] not in (None, key)
+    assert templates.make_key("select id from orders", [("orders", ORDERS_TYPES)], ["id"], "snowflake") == (
+        None,
+        None,
+    )
+
+
+def test_get_renames_tables():
+    templates = LineageTemplates()
+    templates.put("key", ["db.eu.orders"], {"id": [("id", "db.eu.orders"), ("id", "db.eu.other")]})
+    assert templates.get("missing", ["db.us.orders"]) is None
+    assert templates.get("key", ["db.us.orders"]) == {"id": [("id", "db.us.orders"), ("id", "db.eu.other")]}
+    assert (templates.hits, templates.misses, len(templates)) == (1, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def copied_project(tmp_path_factory):
+    # a copy of stg_orders reading from a copy of raw_orders, in another schema
+    with open(MANIFEST_PATH) as file:
+        manifest = json.load(file)
+    with open(CATALOG_PATH) as file:
+        catalog = json.load(file)
+
+    seed = copy.deepcopy(manifest["nodes"]["seed.jaffle_shop.raw_orders"])
+    seed.update(schema="util_eu", unique_id="seed.jaffle_shop.raw_orders_eu")
+    seed["relation_name"] = "analytics__build.util_eu.raw_orders"
+    manifest["nodes"]["seed.jaffle_shop.raw_orders_eu"] = seed
+    model = copy.deepcopy(manifest["nodes"]["model.jaffle_shop.stg_orders"])
+    model.update(schema="util_eu", unique_id="model.jaffle_shop.stg_orders_eu")
+    model["relation_name"] = "analytics__build.util_eu.stg_orders"
+    model["compiled_code"] = model["compiled_code"].replace("util.raw_orders", "util_eu.raw_orders")
+    model["depends_on"]["nodes"] = ["seed.jaffle_shop.raw_orders_eu"]
+    manifest["nodes"]["model.jaffle_shop.stg_orders_eu"] = model
+
+    seed_entry = copy.deepcopy(catalog["nodes"]["seed.jaffle_shop.raw_orders"])
+    seed_entry["metadata"]["schema"] = "UTIL_EU"
+    catalog["nodes"]["seed.jaffle_shop.raw_orders_eu"] = seed_entry
+    model_entry = copy.deepcopy(catalog["nodes"]["model.jaffle_shop.stg_orders"])
+    model_entry["metadata"]["schema"] = "UTIL_EU"
+    catalog["nodes"]["model.jaffle_shop.stg_orders_eu"] = model_entry
+
+    project_dir = tmp_path_factory.mktemp("project")
+    manifest_path, catalog_path = project_dir / "manifest.json", project_dir / "catalog.json"
+    manifest_path.write_text(json.dumps(manifest))
+    catalog_path.write_text(json.dumps(catalog))
+    return str(manifest_path), str(catalog_path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_templates_match_full_extraction(copied_project, workers):
+    manifest_path, catalog_path = copied_project
+    extractor = DbtColumnLineageExtractor(manifest_path=manifest_path, catalog_path=catalog_path)
+    expected = dict(extractor.iter_lineage_to_direct_parents(workers=workers))
+    templates = LineageTemplates()
+    assert dict(extractor.iter_lineage_to_direct_parents(workers=workers, templates=templates)) == expected
+    assert templates.hits == 1
+
+    assert expected["model.jaffle_shop.stg_orders_eu"]["order_id"] == [
+        {"column": "id", "dbt_node": "seed.jaffle_shop.raw_orders_eu"}
+    ]
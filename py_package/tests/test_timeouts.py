@@ -0,0 +1,111 @@
+import json
+import time
+
+import pytest
+
+from dbt_column_lineage_extractor import cli_direct
+from dbt_column_lineage_extractor import extractor as extractor_module
+from dbt_column_lineage_extractor.timeouts import LineageTimeoutError, LineageTimeouts, time_limit
+
+from conftest import CATALOG_PATH, EXAMPLE_CHILDREN_PATH, EXAMPLE_PARENTS_PATH, MANIFEST_PATH
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+def test_time_limit():
+    with pytest.raises(LineageTimeoutError):
+        with time_limit(0.05):
+            time.sleep(1)
+    # disabled without a limit, and the timer is cleared on exit
+    with time_limit(None):
+        pass
+    with time_limit(0.05):
+        pass
+    time.sleep(0.1)
+
+
+def test_quarantine_round_trip(tmp_path):
+    quarantine_file = str(tmp_path / "quarantine.json")
+    timeouts = LineageTimeouts(model_timeout=1, quarantine_file=quarantine_file)
+    timeouts.record("model.p.a", None)
+    timeouts.record("model.p.b", {"model_timed_out": True, "timed_out_columns": [], "seconds": 1.0})
+    timeouts.record("model.p.c", {"model_timed_out": False, "timed_out_columns": ["x"], "seconds": 0.5})
+    timeouts.save()
+    assert timeouts.summary().startswith("Lineage timeouts: 2 models timed out")
+
+    timeouts = LineageTimeouts(model_timeout=1, quarantine_file=quarantine_file)
+    assert timeouts.is_quarantined("model.p.b") and not timeouts.is_quarantined("model.p.a")
+    assert timeouts.order_models(["model.p.b", "model.p.a", "model.p.c", "model.p.d"]) == [
+        "model.p.a",
+        "model.p.d",
+        "model.p.b",
+        "model.p.c",
+    ]
+    timeouts.record("model.p.b", None)
+    timeouts.save()
+    assert timeouts.released_models == ["model.p.b"]
+    with open(quarantine_file) as file:
+        assert list(json.load(file)) == ["model.p.c"]
+
+
+def test_timed_out_models_are_quarantined(extractor, example_parents, monkeypatch, tmp_path):
+    build_scope = extractor_module.ModelLineageEngine._build_scope
+    slow_model = "model.jaffle_shop.orders"
+    slow_sql = extractor.manifest["nodes"][slow_model]["compiled_code"]
+
+    def slow_build_scope(self):
+        if self.model_sql == slow_sql:
+            time.sleep(1)
+        return build_scope(self)
+
+    quarantine_file = str(tmp_path / "quarantine.json")
+    monkeypatch.setattr(extractor_module.ModelLineageEngine, "_build_scope", slow_build_scope)
+    timeouts = LineageTimeouts(model_timeout=0.1, quarantine_file=quarantine_file)
+    lineage = dict(extractor.iter_lineage_to_direct_parents(timeouts=timeouts))
+    timeouts.save()
+    assert timeouts.timed_out_models == [slow_model]
+    assert lineage[slow_model] == {}
+    assert {model: columns for model, columns in lineage.items() if model != slow_model} == {
+        model: columns for model, columns in example_parents.items() if model != slow_model
+    }
+
+    monkeypatch.setattr(extractor_module.ModelLineageEngine, "_build_scope", build_scope)
+    timeouts = LineageTimeouts(model_timeout=10, quarantine_file=quarantine_file)
+    assert dict(extractor.iter_lineage_to_direct_parents(timeouts=timeouts)) == example_parents
+    assert timeouts.released_models == [slow_model]
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_quarantined_run_matches_normal_run(run_cli, tmp_path, workers):
+    quarantine_file = tmp_path / "quarantine.json"
+    entry = {"model_timed_out": True, "timed_out_columns": [], "seconds": 1.0, "timestamp": 0}
+    quarantine_file.write_text(
+        json.dumps({"model.jaffle_shop.stg_customers": entry, "model.jaffle_shop.customers": entry})
+    )
+    run_cli(
+        cli_direct.main,
+        "--manifest", MANIFEST_PATH,
+        "--catalog", CATALOG_PATH,
+        "--output-dir", str(tmp_path),
+        "--quarantine-file", str(quarantine_file),
+        "--model-timeout", "60",
+        "--workers", workers,
+    )
+    # the quarantined models were extracted last, and released
+    assert json.loads(quarantine_file.read_text()) == {}
+    for file_name, expected_path in (
+        ("lineage_to_direct_parents.json", EXAMPLE_PARENTS_PATH),
+        ("lineage_to_direct_children.json", EXAMPLE_CHILDREN_PATH),
+    ):
+        with open(expected_path, "rb") as file:
+            assert (tmp_path / file_name).read_bytes() == file.read()
+
+
+def test_processing_order_is_quarantine_order(extractor, example_parents, tmp_path, capsys):
+    quarantine_file = tmp_path / "quarantine.json"
+    quarantine_file.write_text(json.dumps({"model.jaffle_shop.customers": {"model_timed_out": True}}))
+    timeouts = LineageTimeouts(quarantine_file=str(quarantine_file))
+    assert list(extractor.iter_lineage_to_direct_parents(timeouts=timeouts)) == list(example_parents.items())
+    output = capsys.readouterr().out
+    processed = [line.split()[-1] for line in output.splitlines() if "Processing model" in line]
+    assert processed[-1] == "model.jaffle_shop.customers"
@@ -0,0 +1,24 @@
+import pytest
+
+from dbt_column_lineage_extractor import utils
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {},
+        {"model.p.a": {}},
+        {"model.p.a": {"id": [{"column": "id", "dbt_node": "seed.p.s"}], "name": []}, "model.p.b": {"x": []}},
+    ],
+)
+def test_write_items_to_file_matches_write_dict_to_file(tmp_path, value):
+    utils.write_dict_to_file(value, tmp_path / "dict.json")
+    utils.write_items_to_file(iter(value.items()), tmp_path / "items.json")
+    assert (tmp_path / "items.json").read_bytes() == (tmp_path / "dict.json").read_bytes()
+    assert utils.read_dict_from_file(tmp_path / "items.json") == value
+
+
+def test_write_items_to_file_matches_examples(tmp_path, example_parents):
+    utils.write_dict_to_file(example_parents, tmp_path / "dict.json")
+    utils.write_items_to_file(example_parents.items(), tmp_path / "items.json")
+    assert (tmp_path / "items.json").read_bytes() == (tmp_path / "dict.json").read_bytes()